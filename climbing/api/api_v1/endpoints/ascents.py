@@ -1,32 +1,53 @@
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Body, Depends, Path, Request
+from fastapi import APIRouter, Body, Depends, Path, Request, Response
 from pydantic import UUID4
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.selectable import Select
 from sqlmodel import col
 
-from climbing.core.responses import ID_NOT_FOUND, UNAUTHORIZED
+from climbing.api.deps import conditional_get
+from climbing.core.responses import ID_NOT_FOUND, INVALID_CURSOR, UNAUTHORIZED
 from climbing.core.security import current_active_user
 from climbing.crud import ascent as crud_ascent
 from climbing.crud import route as crud_route
 from climbing.db.models.ascent import Ascent, AscentCreate
+from climbing.db.models.route import Route
+from climbing.db.models.route_image import RouteImage
 from climbing.db.models.user import User
-from climbing.db.session import get_async_session
+from climbing.db.session import get_async_read_session, get_async_session
 from climbing.schemas.ascent import AscentReadWithAll
 from climbing.schemas.filters.ascents_filter import AscentsFilter
 from climbing.schemas.filters.order_enum import Order
+from climbing.schemas.filters.pagination import Pagination
+from climbing.util.json_response import json_response
+from climbing.util.pagination import set_next_page_link
+from climbing.util.rating_cache import invalidate_rating
 
 router = APIRouter()
 
+# Ascents are returned together with their routes and users
+ascents_etag_models = (Ascent, Route, RouteImage, User)
 
-@router.get("", response_model=list[AscentReadWithAll], name="ascents:all")
+
+@router.get(
+    "",
+    response_model=list[AscentReadWithAll],
+    name="ascents:all",
+    responses=INVALID_CURSOR.docs(),
+    dependencies=[Depends(conditional_get(*ascents_etag_models, max_age=30))],
+)
 async def ascents(
     request: Request,
+    response: Response,
     filter: AscentsFilter = Depends(),
-    session: AsyncSession = Depends(get_async_session),
+    pagination: Pagination = Depends(),
+    session: AsyncSession = Depends(get_async_read_session),
 ):
-    """Получение списка всех подъёмов"""
+    """Получение списка всех подъёмов. При указании limit список
+    разбивается на страницы, ссылка на следующую страницу передаётся в
+    заголовке Link"""
+    paginated = pagination.limit is not None or pagination.cursor is not None
 
     def query_modifier(query: Select[tuple[Ascent]]) -> Select[tuple[Ascent]]:
         if filter.date_from is not None:
@@ -37,6 +58,8 @@ async def ascents(
             query = query.where(col(Ascent.route_id) == filter.route_id)
         if filter.user_id is not None:
             query = query.where(col(Ascent.user_id) == filter.user_id)
+        if paginated:
+            return query
         match filter.sort_by_date:
             case Order.ASCENDING:
                 query = query.order_by(col(Ascent.date).asc())
@@ -46,25 +69,41 @@ async def ascents(
                 pass
         return query
 
-    _ascents = await crud_ascent.get_all(session, query_modifier)
-    for _ascent in _ascents:
-        _ascent.set_absolute_image_urls(request)
-    return _ascents
+    _ascents = await crud_ascent.get_all(
+        session,
+        query_modifier,
+        pagination=pagination if paginated else None,
+        descending=filter.sort_by_date != Order.ASCENDING,
+    )
+    set_next_page_link(request, response, pagination, _ascents, "date")
+    return json_response(list[AscentReadWithAll], _ascents, headers=response.headers)
 
 
-@router.get("/recent", response_model=list[AscentReadWithAll], name="ascents:recent")
+@router.get(
+    "/recent",
+    response_model=list[AscentReadWithAll],
+    name="ascents:recent",
+    responses=INVALID_CURSOR.docs(),
+    dependencies=[
+        Depends(conditional_get(*ascents_etag_models, max_age=15, daily=True))
+    ],
+)
 async def recent_ascents(
     request: Request,
-    session: AsyncSession = Depends(get_async_session),
+    response: Response,
+    pagination: Pagination = Depends(),
+    session: AsyncSession = Depends(get_async_read_session),
 ):
     """Получение списка недавних подъёмов"""
 
     return await ascents(
         request=request,
+        response=response,
         filter=AscentsFilter(
             date_from=datetime.now() - timedelta(days=45),
             sort_by_date=Order.DESCENDING,
         ),
+        pagination=pagination,
         session=session,
     )
 
@@ -76,7 +115,6 @@ async def recent_ascents(
     responses={**ID_NOT_FOUND.docs(), **UNAUTHORIZED.docs()},
 )
 async def ascent_create(
-    request: Request,
     date: datetime = Body(...),
     is_flash: bool = Body(...),
     route_id: UUID4 = Body(...),
@@ -96,7 +134,7 @@ async def ascent_create(
             user_id=user.id,
         ),
     )
-    _ascent.set_absolute_image_urls(request)
+    await invalidate_rating()
     return _ascent
 
 
@@ -107,15 +145,13 @@ async def ascent_create(
     responses=ID_NOT_FOUND.docs(),
 )
 async def ascent(
-    request: Request,
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_async_read_session),
     ascent_id: UUID4 = Path(...),
 ):
     """Получение подъёма по ID"""
     _ascent = await crud_ascent.get(session, ascent_id)
     if _ascent is None:
         raise ID_NOT_FOUND.exception()
-    _ascent.set_absolute_image_urls(request)
     return _ascent
 
 
@@ -126,7 +162,6 @@ async def ascent(
     responses={**ID_NOT_FOUND.docs(), **UNAUTHORIZED.docs()},
 )
 async def ascent_remove(
-    request: Request,
     session: AsyncSession = Depends(get_async_session),
     ascent_id: UUID4 = Path(...),
     user: User = Depends(current_active_user),
@@ -138,6 +173,5 @@ async def ascent_remove(
     if _ascent.user_id != user.id and not user.is_superuser:
         raise UNAUTHORIZED.exception()
     _ascent = await crud_ascent.remove(session, row_id=ascent_id)
-    if _ascent is not None:
-        _ascent.set_absolute_image_urls(request)
+    await invalidate_rating()
     return _ascent
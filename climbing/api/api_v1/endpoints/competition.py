@@ -1,32 +1,52 @@
 from datetime import date
 
-from fastapi import APIRouter, Body, Depends, Path
+from fastapi import APIRouter, Body, Depends, Path, Request, Response
 from pydantic import UUID4
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import climbing.core.responses as responses
+from climbing.api.deps import conditional_get
 from climbing.core.security import current_active_user
 from climbing.crud import competition as crud_competition
-from climbing.db.models.competition import CompetitionCreate
+from climbing.db.models.competition import Competition, CompetitionCreate
 from climbing.db.models.competition_participant import (
+    CompetitionParticipant,
     CompetitionParticipantCreate,
     CompetitionParticipantCreateWithCompetition,
 )
 from climbing.db.models.user import User
-from climbing.db.session import get_async_session
+from climbing.db.session import get_async_read_session, get_async_session
 from climbing.schemas.base_read_classes import CompetitionRead
 from climbing.schemas.competition import CompetitionReadWithAll
+from climbing.schemas.filters.pagination import Pagination
+from climbing.util.json_response import json_response
+from climbing.util.pagination import set_next_page_link
+from climbing.util.rating_cache import invalidate_rating
 
 router = APIRouter()
 
 
-@router.get("", response_model=list[CompetitionReadWithAll])
+@router.get(
+    "",
+    response_model=list[CompetitionReadWithAll],
+    responses=responses.INVALID_CURSOR.docs(),
+    dependencies=[
+        Depends(conditional_get(Competition, CompetitionParticipant, User, max_age=60))
+    ],
+)
 async def competitions(
-    async_session: AsyncSession = Depends(get_async_session),
+    request: Request,
+    response: Response,
+    pagination: Pagination = Depends(),
+    async_session: AsyncSession = Depends(get_async_read_session),
 ):
     """Получения списка всех соревнований"""
-    return await crud_competition.get_all(session=async_session)
+    result = await crud_competition.get_all(
+        session=async_session, pagination=pagination
+    )
+    set_next_page_link(request, response, pagination, result, "created_at")
+    return json_response(list[CompetitionReadWithAll], result, headers=response.headers)
 
 
 @router.post(
@@ -54,9 +74,11 @@ async def create_competition(
         participants=participants,
     )
     try:
-        return await crud_competition.create(async_session, competition_create)
+        result = await crud_competition.create(async_session, competition_create)
     except IntegrityError as error:
         raise responses.INTEGRITY_ERROR.exception() from error
+    await invalidate_rating()
+    return result
 
 
 @router.post(
@@ -80,7 +102,7 @@ async def add_participant(
     if competition.organizer_id != user.id or not user.is_superuser:
         raise responses.UNAUTHORIZED.exception()
     try:
-        return await crud_competition.add_participant(
+        result = await crud_competition.add_participant(
             async_session,
             CompetitionParticipantCreate(
                 **participant.dict(), competition_id=competition_id
@@ -88,6 +110,8 @@ async def add_participant(
         )
     except IntegrityError as error:
         raise responses.INTEGRITY_ERROR.exception() from error
+    await invalidate_rating()
+    return result
 
 
 @router.delete(
@@ -109,4 +133,6 @@ async def delete_competition(
         raise responses.ID_NOT_FOUND.exception()
     if competition.organizer_id != user.id and not user.is_superuser:
         raise responses.UNAUTHORIZED.exception()
-    return await crud_competition.remove(async_session, row_id=competition_id)
+    result = await crud_competition.remove(async_session, row_id=competition_id)
+    await invalidate_rating()
+    return result
@@ -2,56 +2,172 @@ import logging
 import time
 import urllib.parse
 from datetime import datetime
-from io import BytesIO
-from typing import List
+from tempfile import SpooledTemporaryFile
+from typing import Any, AsyncGenerator, List
 
-from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import col
-from xlsxwriter import Workbook
 
+from climbing.api.deps import conditional_get
+from climbing.core import responses
+from climbing.core.config import settings
+from climbing.core.job_queue import REFRESH_RATING_JOB, job_queue
 from climbing.core.score_maps import category_to_score_map, place_to_score_map
+from climbing.core.security import current_superuser
 from climbing.crud.crud_competition import competition as crud_competition
+from climbing.crud.crud_rating_snapshot import rating_snapshot as crud_rating_snapshot
+from climbing.db.data_version import data_versions
+from climbing.db.models.ascent import Ascent
 from climbing.db.models.competition import Competition
-from climbing.db.models.user import SexEnum
-from climbing.db.session import get_async_session
+from climbing.db.models.competition_participant import CompetitionParticipant
+from climbing.db.models.route import Route
+from climbing.db.models.route_image import RouteImage
+from climbing.db.models.user import SexEnum, User
+from climbing.db.session import async_session_maker, get_async_read_session
 from climbing.schemas.base_read_classes import CompetitionRead
 from climbing.schemas.category_to_score import CategoryToScore
 from climbing.schemas.filters.rating_filter import RatingFilter
-from climbing.schemas.score import Score
+from climbing.schemas.filters.table_format_enum import TableFormat
+from climbing.schemas.score import NormalizedRating, Score
+from climbing.util.in_memory_rating_calculator import create_rating_calculator
+from climbing.util.json_response import json_response
+from climbing.util.rating_cache import RatingCacheKey, RatingCacheStats, rating_cache
 from climbing.util.rating_calculator import RatingCalculator
+from climbing.util.rating_table import iter_file, iter_rating_csv, write_rating_xlsx
 
 router = APIRouter()
 
+# Size of xlsx table after which it is moved from memory to disk
+XLSX_SPOOL_MAX_SIZE = 1024 * 1024
+# Rating is built from rows of these tables. By default it also depends on
+# current date
+RATING_MODELS = (Ascent, Route, RouteImage, User, Competition, CompetitionParticipant)
+RATING_TABLES: list[str] = [
+    model.__tablename__ for model in RATING_MODELS  # type: ignore[misc]
+]
+rating_etag = conditional_get(*RATING_MODELS, max_age=60, daily=True)
+
+
+async def get_snapshot_session() -> AsyncGenerator[AsyncSession | None, None]:
+    """Session of primary database for storing rating snapshots. Rating
+    computed from read replica may miss latest changes, so it isn't stored
+    and None is returned if replica is configured"""
+    if settings.SQLALCHEMY_READ_DATABASE_URI is not None:
+        yield None
+        return
+    async with async_session_maker() as session:
+        yield session
+
+
+def _cache_key(
+    calc: RatingCalculator,
+    rating_filter: RatingFilter | None,
+    versions: dict[str, int],
+) -> RatingCacheKey:
+    return rating_cache.make_key(
+        calc.start_date,
+        calc.end_date,
+        (rating_filter or RatingFilter()).key,
+        data_versions.key(versions),
+    )
+
+
+async def get_cached_rating(
+    session: AsyncSession, end_date: datetime | None = None
+) -> RatingCalculator | None:
+    """Returns rating without filters with default date range if it is cached
+    by this process, otherwise None. Rating isn't calculated, so callers which
+    need only a part of it may query that part instead"""
+    if end_date is None:
+        end_date = datetime.now()
+    versions = await data_versions.versions(session, RATING_TABLES)
+    calc = create_rating_calculator(session=session)
+    calc.set_date_range(end_date=end_date)
+    cached_scores = rating_cache.get(_cache_key(calc, None, versions))
+    if cached_scores is None:
+        return None
+    calc.load_scores(cached_scores)
+    return calc
+
 
 async def prepare_rating(
-    request: Request,
     session: AsyncSession,
+    write_session: AsyncSession | None,
     start_date: datetime | None = None,
     end_date: datetime | None = None,
     rating_filter: RatingFilter | None = None,
+    use_cache: bool = True,
+    versions: dict[str, int] | None = None,
 ) -> RatingCalculator:
+    """Calculates rating or loads it from cache or snapshot. Rating is
+    calculated from session. Calculated rating with default date range is
+    stored as snapshot by write_session, which must be given only if session
+    reads up-to-date data of primary database. Snapshot and cache entry are
+    bound to data versions read before calculation, so rating calculated
+    while data was changed isn't returned after the change. Cached rating
+    isn't read if use_cache is False. versions are data versions of
+    RATING_TABLES which were read before calculation, for example by
+    rating_etag. They are read by session if not given"""
     if end_date is None:
         end_date = datetime.now()
 
-    calc = RatingCalculator(session=session, filter_params=rating_filter)
+    if versions is None:
+        versions = await data_versions.versions(session, RATING_TABLES)
+
+    calc = create_rating_calculator(session=session, filter_params=rating_filter)
     calc.set_date_range(end_date=end_date, start_date=start_date)
-    await calc.fill_ascents(request=request)
-    await calc.calc_routes_competition(request=request)
+    cache_key = _cache_key(calc, rating_filter, versions)
+    cached_scores = rating_cache.get(cache_key) if use_cache else None
+    if cached_scores is not None:
+        calc.load_scores(cached_scores)
+        return calc
+    # Сохраняются только рейтинги со стандартным временным интервалом
+    use_snapshot = start_date is None
+    if use_snapshot:
+        scores = await crud_rating_snapshot.get_scores(
+            session, calc.end_date.date(), versions, rating_filter
+        )
+        if scores is not None:
+            calc.load_scores(scores)
+            rating_cache.put(cache_key, scores)
+            return calc
+    await calc.fill_ascents()
+    await calc.calc_routes_competition()
     await calc.fill_other_competition_scores()
     calc.fill_routes_competition_scores()
+    scores = calc.scores
+    if use_snapshot and write_session is not None:
+        await crud_rating_snapshot.store(
+            write_session, calc.end_date.date(), versions, rating_filter, scores
+        )
+    rating_cache.put(cache_key, scores)
     return calc
 
 
+@job_queue.handler(REFRESH_RATING_JOB)
+async def refresh_rating(_: dict[str, Any]) -> None:
+    """Calculates current rating without filters and stores it in cache and
+    snapshot. Rating is calculated from primary database, so snapshot is kept
+    up to date even if requests are served by read replica. Cache isn't read,
+    so stored snapshot is always calculated from data read by the job"""
+    async with async_session_maker() as session:
+        await prepare_rating(session, session, use_cache=False)
+
+
 @router.get(
     "",
     name="rating:rating",
     response_model=List[Score],
 )
 async def rating(
-    request: Request,
-    session: AsyncSession = Depends(get_async_session),
+    response: Response,
+    versions: dict[str, int] = Depends(rating_etag),
+    session: AsyncSession = Depends(get_async_read_session),
+    write_session: AsyncSession | None = Depends(get_snapshot_session),
     start_date: datetime | None = Query(None),
     end_date: datetime | None = Query(None),
     is_student: bool | None = Query(None),
@@ -63,16 +179,53 @@ async def rating(
     start = time.time()
     result = (
         await prepare_rating(
-            request=request,
             session=session,
+            write_session=write_session,
             start_date=start_date,
             end_date=end_date,
             rating_filter=RatingFilter(is_student=is_student, sex=sex),
+            versions=versions,
         )
     ).scores
     end = time.time()
     logging.info(f"Rating calc time: {end - start}s")
-    return result
+    # Scores are already validated models, so they are dumped as is
+    return json_response(List[Score], result, validate=False, headers=response.headers)
+
+
+@router.get(
+    "/normalized",
+    name="rating:rating_normalized",
+    response_model=NormalizedRating,
+)
+async def rating_normalized(
+    response: Response,
+    versions: dict[str, int] = Depends(rating_etag),
+    session: AsyncSession = Depends(get_async_read_session),
+    write_session: AsyncSession | None = Depends(get_snapshot_session),
+    start_date: datetime | None = Query(None),
+    end_date: datetime | None = Query(None),
+    is_student: bool | None = Query(None),
+    sex: SexEnum | None = Query(None),
+):
+    """Получение данных по рейтингу в нормализованном виде: пролазы и участия
+    ссылаются на трассы, пользователей и соревнования по ID, а сами объекты
+    передаются один раз в словарях routes, users и competitions"""
+
+    calc = await prepare_rating(
+        session=session,
+        write_session=write_session,
+        start_date=start_date,
+        end_date=end_date,
+        rating_filter=RatingFilter(is_student=is_student, sex=sex),
+        versions=versions,
+    )
+    return json_response(
+        NormalizedRating,
+        NormalizedRating.from_scores(calc.scores),
+        validate=False,
+        headers=response.headers,
+    )
 
 
 @router.get(
@@ -81,33 +234,30 @@ async def rating(
     response_model=List[Score],
 )
 async def rating_csv(
-    request: Request,
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_async_read_session),
+    write_session: AsyncSession | None = Depends(get_snapshot_session),
     start_date: datetime | None = Query(None),
     end_date: datetime | None = Query(None),
     is_student: bool | None = Query(None),
     sex: SexEnum | None = Query(None),
+    table_format: TableFormat = Query(TableFormat.XLSX),
 ):
     """Получение xls таблицы с данными по рейтингу. По умолчанию временной интервал — полтора
-    месяца с текущей даты"""
+    месяца с текущей даты. Таблица также может быть получена в формате csv или
+    tsv"""
     calc = await prepare_rating(
-        request=request,
         session=session,
+        write_session=write_session,
         start_date=start_date,
         end_date=end_date,
         rating_filter=RatingFilter(is_student=is_student, sex=sex),
     )
-    scores = calc.scores
-    dataIO = BytesIO()
-    workbook = Workbook(dataIO)
-    worksheet = workbook.add_worksheet()
-    worksheet.write(1, 0, "Место")
-    worksheet.write(1, 1, "Имя участника")
     competitions: list[CompetitionRead] = list(
         map(
             CompetitionRead.model_validate,
             await crud_competition.get_all(
                 session=session,
+                load_plan="plain",
                 query_modifier=lambda query: query.where(
                     col(Competition.date) >= calc.start_date
                 ).where(col(Competition.date) <= calc.end_date),
@@ -115,8 +265,6 @@ async def rating_csv(
         )
     )
     competitions.insert(0, calc._get_ascent_competition())
-    format = workbook.add_format()
-    format.set_align("center")
     rating_student_name = {
         True: "Студенческий ",
         False: "НеСтуденческий ",
@@ -128,47 +276,53 @@ async def rating_csv(
         None: "",
     }
     rating_fullname = f"{rating_student_name[is_student]}{rating_sex_name[sex]}рейтинг на {calc.end_date.date()}"
-    worksheet.merge_range(
-        first_row=0,
-        first_col=0,
-        last_row=0,
-        last_col=2 + len(competitions),
-        data=rating_fullname,
-        cell_format=format,
-    )
-    worksheet.write(1, 2 + len(competitions), "Итого баллы")
-
-    for i, competition in enumerate(competitions):
-        worksheet.write(1, 2 + i, f"{competition.name} (коэфф {competition.ratio})")
-    for i, score in enumerate(scores):
-        participations = {
-            participation.competition.id: participation
-            for participation in score.participations
-        }
-        worksheet.write(2 + i, 0, score.place)
-        worksheet.write(2 + i, 1, f"{score.user.last_name} {score.user.first_name}")
-        for j, competition in enumerate(competitions):
-            if competition.id in participations:
-                score_value = participations[competition.id].score
-            else:
-                score_value = 0
-            worksheet.write(2 + i, 2 + j, score_value)
-        worksheet.write(2 + i, 2 + len(competitions), score.score)
-    worksheet.autofit()
-    workbook.close()
-    result = dataIO.getvalue()
-    return Response(
-        content=result,
-        media_type="application/vnd.ms-excel",
-        headers={
-            "Content-Disposition": (
-                "attachment; filename*=UTF-8''"
-                + urllib.parse.quote(f"{rating_fullname}.xlsx".encode())
-            )
-        },
+    headers = {
+        "Content-Disposition": (
+            "attachment; filename*=UTF-8''"
+            + urllib.parse.quote(f"{rating_fullname}.{table_format.value}".encode())
+        )
+    }
+    if table_format == TableFormat.XLSX:
+        file = SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_SIZE)
+        await run_in_threadpool(
+            write_rating_xlsx, file, rating_fullname, competitions, calc.scores
+        )
+        return StreamingResponse(
+            iter_file(file),
+            media_type="application/vnd.ms-excel",
+            headers=headers,
+        )
+    return StreamingResponse(
+        iter_rating_csv(
+            rating_fullname,
+            competitions,
+            calc.scores,
+            delimiter="," if table_format == TableFormat.CSV else "\t",
+        ),
+        media_type=(
+            "text/csv"
+            if table_format == TableFormat.CSV
+            else "text/tab-separated-values"
+        ),
+        headers=headers,
     )
 
 
+@router.get(
+    "/cache_stats",
+    name="rating:cache_stats",
+    response_model=RatingCacheStats,
+    dependencies=[Depends(current_superuser)],
+    responses={
+        **responses.UNAUTHORIZED.docs(),
+        **responses.SUPERUSER_REQUIRED.docs(),
+    },
+)
+def cache_stats():
+    """Статистика кэша рейтинга"""
+    return rating_cache.stats
+
+
 @router.get("/category_score_map", response_model=list[CategoryToScore])
 def category_score_map():
     """Список оценок трасс"""
@@ -9,6 +9,7 @@ from fastapi import (
     Path,
     Query,
     Request,
+    Response,
     UploadFile,
 )
 from fastapi.exceptions import RequestValidationError
@@ -18,24 +19,38 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.selectable import Select
 from sqlmodel import col
 
+from climbing.api.deps import conditional_get
 from climbing.core import responses
 from climbing.core.security import current_active_user
 from climbing.core.user_manager import UserManager, get_user_manager
 from climbing.crud import route as crud_route
 from climbing.db.models import Category, RouteCreate, User
 from climbing.db.models.route import Route, RouteBase, RouteUpdate
-from climbing.db.session import get_async_session
+from climbing.db.models.route_image import RouteImage
+from climbing.db.session import get_async_read_session, get_async_session
 from climbing.schemas import RouteReadWithAll
+from climbing.schemas.filters.pagination import Pagination
 from climbing.schemas.filters.routes_filter import RoutesFilter
+from climbing.util.json_response import json_response
+from climbing.util.pagination import set_next_page_link
+from climbing.util.rating_cache import invalidate_rating
 
 router = APIRouter()
 
 
-@router.get("", response_model=list[RouteReadWithAll], name="routes:all")
+@router.get(
+    "",
+    response_model=list[RouteReadWithAll],
+    name="routes:all",
+    responses=responses.INVALID_CURSOR.docs(),
+    dependencies=[Depends(conditional_get(Route, RouteImage, User, max_age=30))],
+)
 async def routes(
     request: Request,
+    response: Response,
     filter: RoutesFilter = Depends(),
-    session: AsyncSession = Depends(get_async_session),
+    pagination: Pagination = Depends(),
+    session: AsyncSession = Depends(get_async_read_session),
 ):
     "Получение списка всех трасс"
 
@@ -46,10 +61,9 @@ async def routes(
             query = query.where(col(Route.author_id) == filter.author_id)
         return query
 
-    _routes = await crud_route.get_all(session, query_modifier)
-    for _route in _routes:
-        _route.set_absolute_image_urls(request)
-    return _routes
+    _routes = await crud_route.get_all(session, query_modifier, pagination)
+    set_next_page_link(request, response, pagination, _routes, "created_at")
+    return json_response(list[RouteReadWithAll], _routes, headers=response.headers)
 
 
 @router.get(
@@ -59,15 +73,13 @@ async def routes(
     responses=responses.ID_NOT_FOUND.docs(),
 )
 async def route(
-    request: Request,
     route_id: UUID = Path(...),
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_async_read_session),
 ):
     "Получение трассы"
     route_instance = await crud_route.get(session, route_id)
     if route_instance is None:
         raise responses.ID_NOT_FOUND.exception()
-    route_instance.set_absolute_image_urls(request)
     return route_instance
 
 
@@ -92,6 +104,7 @@ async def delete_route(
     if route_instance.author_id != user.id and not user.is_superuser:
         raise responses.UNAUTHORIZED.exception()
     await crud_route.remove(session, row_id=route_id)
+    await invalidate_rating()
 
 
 @router.put(
@@ -105,9 +118,9 @@ async def delete_route(
     },
 )
 async def update_route(
-    request: Request,
     route_id=Path(...),
     new_author_id: UUID | None = Query(None),
+    kept_image_ids: list[UUID] = Query([]),
     route_obj: RouteBase = Depends(),
     images: list[UploadFile] = File([], media_type="image/*"),
     current_user: User = Depends(current_active_user),
@@ -115,7 +128,8 @@ async def update_route(
     session: AsyncSession = Depends(get_async_session),
 ) -> RouteReadWithAll:
     """Изменение трассы. Попытка вызвать этот метод в Swagger приводит к ошибке
-    — Swagger неправильно выставляет Content-Length"""
+    — Swagger неправильно выставляет Content-Length. Изображения из
+    kept_image_ids и повторно отправленные изображения не загружаются заново"""
 
     old_db_route = await crud_route.get(session, route_id)
     if old_db_route is None:
@@ -134,11 +148,12 @@ async def update_route(
             **route_obj.model_dump(),
             author_id=author.id,
             images=images,
+            kept_image_ids=kept_image_ids,
         )
         updated_route = await crud_route.update(
             session, db_entity=old_db_route, new_entity=db_route
         )
-        updated_route.set_absolute_image_urls(request)
+        await invalidate_rating()
         return RouteReadWithAll.model_validate(updated_route)
     except ValidationError as err:
         print(err)
@@ -155,7 +170,6 @@ async def update_route(
     responses=responses.UNAUTHORIZED.docs(),
 )
 async def create_route(
-    request: Request,
     name: str = Form(..., min_length=1, max_length=150),
     category: Category = Form(...),
     mark_color: str = Form(..., min_length=4, max_length=100),
@@ -177,7 +191,6 @@ async def create_route(
             images=images,
         )
         created_route = await crud_route.create(session, route_instance)
-        created_route.set_absolute_image_urls(request)
         return created_route
     except ValidationError as err:
         raise RequestValidationError(
@@ -196,12 +209,11 @@ async def create_route(
     response_model=RouteReadWithAll,
 )
 async def archive_route(
-    request: Request,
     route_id: UUID = Path(...),
     session: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_active_user),
 ):
-    obj = await route(request, route_id, session)
+    obj = await route(route_id, session)
     if obj.author_id != user.id and not user.is_superuser:
         raise responses.ACCESS_DENIED.exception()
     updated_obj = await crud_route.archive(session, row_id=obj.id)
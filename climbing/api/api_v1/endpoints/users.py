@@ -1,38 +1,30 @@
 from datetime import datetime
-from typing import Sequence
 
 from dateutil.relativedelta import relativedelta
-from fastapi import APIRouter, HTTPException, Path, Request, status
+from fastapi import APIRouter, HTTPException, Path, Request, Response, status
 from fastapi.param_functions import Depends
 from fastapi_users.exceptions import UserNotExists
 from pydantic import UUID4
 from sqlalchemy.ext.asyncio.session import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.sql import Select
-from sqlmodel import col
 
 from climbing.core import responses
 from climbing.core.security import current_superuser, current_user, fastapi_users
 from climbing.core.user_manager import UserManager, get_user_manager
 from climbing.crud import ascent as crud_ascent
 from climbing.crud import competition as crud_competition
-from climbing.crud import competition_participant as crud_competition_participant
 from climbing.crud import route as crud_route
-from climbing.db.models import Route, User
-from climbing.db.models.ascent import Ascent, AscentUpdate
-from climbing.db.models.competition import Competition, CompetitionUpdate
-from climbing.db.models.competition_participant import (
-    CompetitionParticipant,
-    CompetitionParticipantUpdate,
-)
-from climbing.db.models.route import RouteUpdate
+from climbing.crud import user as crud_user
+from climbing.db.models import User
 from climbing.db.models.user import UserUpdate
 from climbing.db.session import get_async_session
 from climbing.schemas import UserRead
 from climbing.schemas.ascent import AscentReadWithAll
 from climbing.schemas.competition import CompetitionReadWithAll
 from climbing.schemas.expiring_ascent import ExpiringAscent
+from climbing.schemas.filters.pagination import Pagination
 from climbing.schemas.route import RouteReadWithAll
+from climbing.util.pagination import paginate, set_next_page_link
 
 router = APIRouter()
 
@@ -42,13 +34,26 @@ router = APIRouter()
     response_model=list[UserRead],
     name="users:all_users",
     dependencies=[Depends(current_user)],
-    responses=responses.UNAUTHORIZED.docs(),
+    responses={
+        **responses.UNAUTHORIZED.docs(),
+        **responses.INVALID_CURSOR.docs(),
+    },
 )
 async def read_users(
+    request: Request,
+    response: Response,
+    pagination: Pagination = Depends(),
     async_session: AsyncSession = Depends(get_async_session),
 ):
     """Список пользователей"""
-    return (await async_session.execute(select(User))).scalars().all()
+    # created_at may be NULL for old users, so users are paginated by id only
+    users = (
+        (await async_session.execute(paginate(select(User), pagination, User.id)))
+        .scalars()
+        .all()
+    )
+    set_next_page_link(request, response, pagination, users)
+    return users
 
 
 @router.delete(
@@ -62,18 +67,11 @@ async def delete_me(
     user: User = Depends(current_user),
     user_manager: UserManager = Depends(get_user_manager),
 ):
-    """Удаление текущего пользователя"""
-    user_routes: Sequence[Route] = (
-        (
-            await async_session.execute(
-                select(Route).where(col(Route.author_id) == user.id)
-            )
-        )
-        .scalars()
-        .all()
-    )
-    for route in user_routes:
-        await crud_route.remove(async_session, row_id=route.id)
+    """Удаление текущего пользователя вместе с его трассами и пролазами.
+    Изображения трасс удаляются из хранилища фоновой задачей"""
+    await crud_user.delete_content(async_session, user)
+    # User manager shares session with endpoint, so content is deleted in the
+    # same transaction as user
     await user_manager.delete(user)
 
 
@@ -84,15 +82,11 @@ async def delete_me(
     responses=responses.UNAUTHORIZED.docs(),
 )
 async def read_user_routes(
-    request: Request,
     async_session: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_user),
 ):
     """Список трасс текущего пользователя"""
-    _routes = await crud_route.get_for_user(async_session, user.id)
-    for _route in _routes:
-        _route.set_absolute_image_urls(request)
-    return _routes
+    return await crud_route.get_for_user(async_session, user.id)
 
 
 @router.get(
@@ -102,15 +96,11 @@ async def read_user_routes(
     responses=responses.UNAUTHORIZED.docs(),
 )
 async def read_user_ascents(
-    request: Request,
     async_session: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_user),
 ):
     """Список подъёмов текущего пользователя"""
-    ascents = await crud_ascent.get_for_user(async_session, user.id)
-    for ascent in ascents:
-        ascent.set_absolute_image_urls(request)
-    return ascents
+    return await crud_ascent.get_for_user(async_session, user.id)
 
 
 @router.get(
@@ -135,7 +125,6 @@ async def read_user_competitions(
     responses=responses.UNAUTHORIZED.docs(),
 )
 async def read_user_expiring_ascents(
-    request: Request,
     async_session: AsyncSession = Depends(get_async_session),
     user: User = Depends(current_user),
 ):
@@ -150,8 +139,6 @@ async def read_user_expiring_ascents(
     ascents = await crud_ascent.get_for_user(
         async_session, user.id, start_date, end_date
     )
-    for ascent in ascents:
-        ascent.set_absolute_image_urls(request)
     return sorted(
         list(
             map(
@@ -182,18 +169,12 @@ async def replace_with_new_user(
     session: AsyncSession = Depends(get_async_session),
     user_manager: UserManager = Depends(get_user_manager),
 ):
-    def participation_query_modifier(query: Select) -> Select:
-        return query.where(col(CompetitionParticipant.user_id) == user_id)
-
-    def ascent_query_modifier(query: Select) -> Select:
-        return query.where(col(Ascent.user_id) == user_id)
-
-    def route_query_modifier(query: Select) -> Select:
-        return query.where(col(Route.author_id) == user_id)
-
-    def competition_query_modifier(query: Select) -> Select:
-        return query.where(col(Competition.organizer_id) == user_id)
-
+    """Передача всех данных пользователя другому пользователю и удаление
+    исходного пользователя. Выполняется в одной транзакции"""
+    if user_id == replacement_id:
+        raise HTTPException(
+            status_code=400, detail="User can't be replaced with themselves"
+        )
     try:
         user = await user_manager.get(user_id)
     except UserNotExists:
@@ -206,43 +187,9 @@ async def replace_with_new_user(
         raise HTTPException(
             status_code=404, detail=f'User with id "{replacement_id}" not found'
         )
-    participations = await crud_competition_participant.get_all(
-        session=session, query_modifier=participation_query_modifier
-    )
-    for participation in participations:
-        new_participation = CompetitionParticipantUpdate.model_validate(participation)
-        new_participation.user_id = replacement.id
-        await crud_competition_participant.update(
-            session=session,
-            db_entity=participation,
-            new_entity=new_participation,
-        )
-    ascents = await crud_ascent.get_all(
-        session=session, query_modifier=ascent_query_modifier
-    )
-    for ascent in ascents:
-        new_ascent = AscentUpdate.model_validate(ascent)
-        new_ascent.user_id = replacement.id
-        await crud_ascent.update(
-            session=session, db_entity=ascent, new_entity=new_ascent
-        )
-    routes = await crud_route.get_all(
-        session=session, query_modifier=route_query_modifier
-    )
-    for route in routes:
-        new_route = RouteUpdate.model_validate(route)
-        new_route.author_id = replacement.id
-        await crud_route.update(session=session, db_entity=route, new_entity=new_route)
-    competitions = await crud_competition.get_all(
-        session=session, query_modifier=competition_query_modifier
-    )
-    for competition in competitions:
-        new_competition = CompetitionUpdate.model_validate(competition)
-        new_competition.organizer_id = replacement.id
-        await crud_competition.update(
-            session=session, db_entity=competition, new_entity=new_competition
-        )
-
+    await crud_user.merge(session, user, replacement)
+    # User manager shares session with endpoint, so merge is committed
+    # together with user deletion
     await user_manager.delete(user)
 
 
@@ -3,12 +3,13 @@ import time
 from datetime import datetime
 from typing import Sequence
 
-from fastapi import APIRouter, Depends, Path, Query, Request
+from fastapi import APIRouter, Depends, Path, Query
 from fastapi_versionizer import api_version
 from pydantic import UUID4
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from climbing.db.session import get_async_session
+from climbing.api.api_v1.endpoints.rating import get_cached_rating
+from climbing.db.session import get_async_read_session
 from climbing.schemas.ascent import AscentReadRatingWithRoute
 from climbing.util.rating_calculator import RatingCalculator
 
@@ -18,18 +19,25 @@ router = APIRouter()
 @api_version(2)
 @router.get("/user/{user_id}/ascents")
 async def ascents(
-    request: Request,
-    session: AsyncSession = Depends(get_async_session),
+    session: AsyncSession = Depends(get_async_read_session),
     start_date: datetime | None = Query(None),
     end_date: datetime | None = Query(None),
     user_id: UUID4 = Path(),
 ) -> Sequence[AscentReadRatingWithRoute]:
     start = time.time()
-    calc = RatingCalculator(session=session)
     if end_date is None:
         end_date = datetime.now()
-    calc.set_date_range(start_date=start_date, end_date=end_date)
-    result = await calc.get_user_rating_ascents(user_id, request)
+    cached_calc: RatingCalculator | None = None
+    if start_date is None and end_date.date() == datetime.now().date():
+        # Current rating is usually cached, so user's ascents are taken from it
+        # if it is. Otherwise only user's ascents are queried
+        cached_calc = await get_cached_rating(session, end_date=end_date)
+    if cached_calc is not None:
+        result = cached_calc.get_cached_user_rating_ascents(user_id)
+    else:
+        calc = RatingCalculator(session=session)
+        calc.set_date_range(start_date=start_date, end_date=end_date)
+        result = await calc.get_user_rating_ascents(user_id)
     logging.debug(result)
     end = time.time()
     logging.info(f"Ascent getting for user {user_id} time: {start - end}")
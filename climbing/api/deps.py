@@ -1,28 +1,70 @@
+import asyncio
+import hashlib
+from datetime import date
+from io import BytesIO
 from mimetypes import guess_extension
+from typing import Awaitable, Callable, Iterable, NamedTuple
 from uuid import uuid4
 
-from fastapi import Header, HTTPException, UploadFile, status
-from minio import Minio, S3Error
+from fastapi import (
+    Depends,
+    Header,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel
 
 from climbing.core import responses
 from climbing.core.config import settings
+from climbing.core.images import (
+    IMAGE_VARIANT_CONTENT_TYPE,
+    IMAGE_VARIANTS,
+    make_variants,
+    variant_name,
+)
+from climbing.core.storage import StorageBackend, get_storage_backend
+from climbing.db.data_version import data_versions
+from climbing.db.session import get_async_read_session
+
+
+HASH_CHUNK_SIZE = 64 * 1024
+# Maximal number of objects removed from storage by one request
+REMOVE_BATCH_SIZE = 1000
+
+
+class StoredFile(NamedTuple):
+    """Saved file description"""
+
+    name: str
+    has_variants: bool = False
+    digest: str | None = None
 
 
 class FileStorage:  # pylint: disable=too-few-public-methods
-    """Class for managing file storage"""
+    """Class for managing file storage. Blocking storage calls are run in
+    worker threads, so they don't block event loop"""
 
-    client: Minio
+    backend: StorageBackend
 
-    def __init__(self) -> None:
-        self.client = Minio(
-            endpoint=settings.MINIO_HOST,
-            access_key=settings.MINIO_ACCESS_KEY,
-            secret_key=settings.MINIO_SECRET_KEY,
-        )
-        if not self.client.bucket_exists(settings.MINIO_BUCKET_NAME):
-            self.client.make_bucket(settings.MINIO_BUCKET_NAME)
+    def __init__(self, backend: StorageBackend | None = None) -> None:
+        self.backend = backend or get_storage_backend()
+
+    @staticmethod
+    def _filename(file: UploadFile, prefix: str, stem: str) -> str:
+        if file.content_type is None or file.size is None:
+            raise responses.INCOMPLETE_FILE_SENT.exception()
+        filename = f"{prefix}{stem}"
+        extension = guess_extension(file.content_type.split(";")[0].strip())
+        if extension is not None:
+            filename += extension
+        return filename
 
-    def save(self, file: UploadFile, prefix: str = "") -> str:
+    async def save(self, file: UploadFile, prefix: str = "") -> str:
         """Saves file and returns path to it (join(root, generated_filename))
 
         Params:
@@ -32,38 +74,138 @@ class FileStorage:  # pylint: disable=too-few-public-methods
         Raises:
             INCOMPLETE_FILE_SENT: if file.content_type or file.size is None
         """
-        if file.content_type is None or file.size is None:
-            raise responses.INCOMPLETE_FILE_SENT.exception()
-        uuid = uuid4()
-        filename = f"{prefix}{uuid.hex}"
-        extension = guess_extension(file.content_type.split(";")[0].strip())
-        if extension is not None:
-            filename += extension
-        self.client.put_object(
-            bucket_name=settings.MINIO_BUCKET_NAME,
-            content_type=file.content_type,
-            object_name=filename,
-            data=file.file,
-            length=file.size,
+        filename = self._filename(file, prefix, uuid4().hex)
+        await run_in_threadpool(
+            self.backend.put, filename, file.file, file.size, file.content_type
         )
         return filename
 
-    def remove(self, filename: str) -> None:
-        self.client.remove_object(settings.MINIO_BUCKET_NAME, filename)
+    def image_name(self, file: UploadFile, digest: str, prefix: str = "") -> str:
+        """Returns content-addressed name under which image is saved
+
+        Raises:
+            INCOMPLETE_FILE_SENT: if file.content_type or file.size is None
+        """
+        return self._filename(file, prefix, digest)
+
+    async def save_image(
+        self, file: UploadFile, prefix: str = "", digest: str | None = None
+    ) -> StoredFile:
+        """Saves image together with its resized variants (see IMAGE_VARIANTS).
+        Image is saved under name derived from its content digest, so the same
+        content always gets the same name. Objects saved before a failure
+        aren't removed, because concurrent request may have saved and
+        referenced the same content. They are removed by garbage collection
+        (see climbing.util.storage_gc), which skips recent objects
+
+        Returns:
+            StoredFile: filename of original image, whether variants were saved
+                and content digest
+        Raises:
+            INCOMPLETE_FILE_SENT: if file.content_type or file.size is None
+        """
+        if digest is None:
+            digest = await self.digest(file)
+        filename = self.image_name(file, digest, prefix)
+        variants = await run_in_threadpool(self._read_variants, file)
+        await run_in_threadpool(
+            self.backend.put, filename, file.file, file.size, file.content_type
+        )
+        await asyncio.gather(
+            *(
+                run_in_threadpool(
+                    self.backend.put,
+                    variant_name(filename, variant),
+                    BytesIO(data),
+                    len(data),
+                    IMAGE_VARIANT_CONTENT_TYPE,
+                )
+                for variant, data in variants.items()
+            )
+        )
+        return StoredFile(filename, has_variants=len(variants) > 0, digest=digest)
+
+    @staticmethod
+    def _digest(file: UploadFile) -> str:
+        hasher = hashlib.sha256()
+        while chunk := file.file.read(HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+        file.file.seek(0)
+        return hasher.hexdigest()
+
+    async def digest(self, file: UploadFile) -> str:
+        """Returns SHA-256 hex digest of file content"""
+        return await run_in_threadpool(self._digest, file)
 
-    def exists(self, filename: str) -> bool:
-        try:
-            self.client.stat_object(settings.MINIO_BUCKET_NAME, filename)
-            return True
-        except S3Error:
-            return False
+    @staticmethod
+    def _read_variants(file: UploadFile) -> dict[str, bytes]:
+        variants = make_variants(file.file.read())
+        file.file.seek(0)
+        return variants
 
-    def clear_unlinked(self, prefix: str, white_list: list[str]) -> None:
-        for obj in self.client.list_objects(
-            bucket_name=settings.MINIO_BUCKET_NAME, prefix=prefix
-        ):
-            if obj.object_name is not None and obj.object_name not in white_list:
-                self.client.remove_object(settings.MINIO_BUCKET_NAME, obj.object_name)
+    async def save_images(
+        self,
+        files: list[UploadFile],
+        prefix: str = "",
+        digests: list[str] | None = None,
+    ) -> list[StoredFile]:
+        """Saves images with their variants concurrently, at most
+        STORAGE_MAX_CONCURRENT_UPLOADS at a time. If any upload fails, the
+        first error is raised after all uploads finish. Saved files are left
+        for garbage collection as in save_image
+
+        Params:
+            digests (list[str] | None): precalculated content digests of files
+        Returns:
+            list[StoredFile]: created files in the same order as files
+        """
+        semaphore = asyncio.Semaphore(settings.STORAGE_MAX_CONCURRENT_UPLOADS)
+
+        async def save_bounded(file: UploadFile, digest: str | None) -> StoredFile:
+            async with semaphore:
+                return await self.save_image(file, prefix=prefix, digest=digest)
+
+        results = await asyncio.gather(
+            *map(save_bounded, files, digests or [None] * len(files)),
+            return_exceptions=True,
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if len(errors) > 0:
+            raise errors[0]
+        return results  # type: ignore
+
+    @staticmethod
+    def _with_variants(images: Iterable[StoredFile]) -> list[str]:
+        filenames: list[str] = []
+        for image in images:
+            filenames.append(image.name)
+            if image.has_variants:
+                filenames.extend(
+                    variant_name(image.name, variant) for variant in IMAGE_VARIANTS
+                )
+        return filenames
+
+    async def remove_images_in_batches(
+        self, images: Iterable[StoredFile], batch_size: int = REMOVE_BATCH_SIZE
+    ) -> list[str]:
+        """Removes images together with their variants using bulk removal of
+        storage backend, batch_size objects per request. Returns names of
+        objects which were not removed"""
+        filenames = self._with_variants(images)
+        failed: list[str] = []
+        for start in range(0, len(filenames), batch_size):
+            failed.extend(
+                await run_in_threadpool(
+                    self.backend.remove_batch, filenames[start : start + batch_size]
+                )
+            )
+        return failed
+
+    async def remove(self, filename: str) -> None:
+        await run_in_threadpool(self.backend.remove, filename)
+
+    async def exists(self, filename: str) -> bool:
+        return await run_in_threadpool(self.backend.exists, filename)
 
 
 def multipart_form_data(content_type: str = Header(...)):
@@ -75,3 +217,48 @@ def multipart_form_data(content_type: str = Header(...)):
             f"Unsupported media type: {content_type}."
             " It must be multipart/form-data",
         )
+
+
+def conditional_get(
+    *models: type[SQLModel], max_age: int, daily: bool = False
+) -> Callable[[Request, Response], Awaitable[dict[str, int]]]:
+    """Returns dependency which sets ETag and Cache-Control headers. ETag is
+    computed from data versions of models' tables, so requests with matching
+    If-None-Match are answered with 304 after the only query of versions.
+    Versions are read by the read session of the request, so they match the
+    data which handler reads. Dependency returns the versions, so handler
+    which caches response can key it by the same versions as ETag
+
+    Args:
+        models (type[SQLModel]): tables which response depends on
+        max_age (int): seconds during which client may reuse response
+            without revalidation
+        daily (bool): whether response depends on current date
+    """
+    cache_control = f"public, max-age={max_age}"
+
+    async def dependency(
+        request: Request,
+        response: Response,
+        session: AsyncSession = Depends(get_async_read_session),
+    ) -> dict[str, int]:
+        versions = await data_versions.versions(
+            session, (model.__tablename__ for model in models)  # type: ignore
+        )
+        etag = data_versions.etag(
+            versions,
+            request.url.path,
+            request.url.query,
+            date.today() if daily else None,
+        )
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+        if_none_match = request.headers.get("If-None-Match", "")
+        client_etags = {
+            tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+        }
+        if etag in client_etags or "*" in client_etags:
+            raise HTTPException(status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return versions
+
+    return dependency
@@ -1,9 +1,19 @@
 from datetime import timedelta
+from typing import Literal
 
 from pydantic import validator
 from pydantic_settings import BaseSettings
 
 
+def async_database_uri(value: str) -> str:
+    """Returns database URI with async driver. PostgreSQL is used through
+    asyncpg"""
+    for prefix in ("postgres://", "postgresql://"):
+        if value.startswith(prefix):
+            return "postgresql+asyncpg://" + value.removeprefix(prefix)
+    return value
+
+
 # pylint: disable=too-few-public-methods
 class Settings(BaseSettings):
     """Class for storing app settings"""
@@ -11,17 +21,56 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_TIME: timedelta = timedelta(days=180)
     REFRESH_TOKEN_EXPIRE_TIME: timedelta = timedelta(days=180)
     SQLALCHEMY_DATABASE_URI: str | None = None
+    # Database used by read-only GET endpoints. Primary database is used
+    # through separate pool if not set
+    SQLALCHEMY_READ_DATABASE_URI: str | None = None
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: timedelta = timedelta(seconds=30)
+    DATABASE_POOL_RECYCLE: timedelta = timedelta(minutes=30)
+    DATABASE_POOL_PRE_PING: bool = True
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE: int = -64000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_BUSY_TIMEOUT: timedelta = timedelta(seconds=5)
     AUTH_TOKEN_ENDPOINT_URL: str = "/api/v2/auth/login"
     MEDIA_ROOT: str = "media"
     MAIL_USERNAME: str
     MAIL_SMTP_HOST: str
     MAIL_SMTP_PORT: int
     MAIL_EXTERNAL_APP_PASSWORD: str
+    # Plain SMTP without TLS is used for local SMTP servers
+    MAIL_USE_SSL: bool = True
+    MAIL_SMTP_TIMEOUT: timedelta = timedelta(seconds=30)
     MINIO_ACCESS_KEY: str
     MINIO_SECRET_KEY: str
     MINIO_HOST: str = "files.ae-mc.ru"
     MINIO_BUCKET_NAME: str = "climbing"
+    MINIO_URL_SCHEME: str = "https"
+    STORAGE_BACKEND: Literal["minio", "local"] = "minio"
+    STORAGE_MAX_CONNECTIONS: int = 10
+    STORAGE_MAX_CONCURRENT_UPLOADS: int = 4
+    # Uploads of failed requests are left in storage and removed only by
+    # garbage collection. It isn't run by this process if set to None
+    STORAGE_GC_INTERVAL: timedelta | None = timedelta(hours=6)
     SECRET: str
+    RATING_CACHE_MAX_SIZE: int = 128
+    RATING_CACHE_TTL: timedelta = timedelta(minutes=5)
+    # SQL engine relies on loose GROUP BY of SQLite, so auto selects it only for
+    # SQLite and in-memory engine for other databases
+    RATING_ENGINE: Literal["auto", "sql", "memory"] = "auto"
+    RATING_REFRESH_DELAY: timedelta = timedelta(seconds=10)
+    # Background jobs aren't executed by this process if set to 0
+    JOB_WORKERS: int = 2
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_DELAY: timedelta = timedelta(seconds=30)
+    JOB_POLL_INTERVAL: timedelta = timedelta(seconds=5)
+    # Running job is locked for this time and lock is extended every third of
+    # it. Job of stopped worker is executed again after lock expires
+    JOB_LEASE: timedelta = timedelta(minutes=1)
+    # Attempt is cancelled and counted as failed after this time
+    JOB_TIMEOUT: timedelta = timedelta(minutes=5)
 
     @validator("SQLALCHEMY_DATABASE_URI", pre=True)
     @classmethod
@@ -35,8 +84,16 @@ class Settings(BaseSettings):
             str: new value of attribute
         """
         if isinstance(value, str):
-            return value
+            return async_database_uri(value)
         return "sqlite+aiosqlite:///climbing.db"
 
+    @validator("SQLALCHEMY_READ_DATABASE_URI", pre=True)
+    @classmethod
+    def assemble_sqlalchemy_read_database_uri(cls, value: str | None) -> str | None:
+        """Sets async driver in SQLALCHEMY_READ_DATABASE_URI"""
+        if isinstance(value, str) and value != "":
+            return async_database_uri(value)
+        return None
+
 
 settings = Settings()  # type: ignore
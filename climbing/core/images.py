@@ -0,0 +1,38 @@
+import posixpath
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+# Maximal width of each image variant. Variants are never upscaled
+IMAGE_VARIANTS: dict[str, int] = {
+    "thumbnail": 320,
+    "medium": 1024,
+}
+IMAGE_VARIANT_FORMAT = "webp"
+IMAGE_VARIANT_CONTENT_TYPE = "image/webp"
+
+
+def variant_name(name: str, variant: str) -> str:
+    """Returns name of image variant stored alongside original image name"""
+    root, _ = posixpath.splitext(name)
+    return f"{root}_{variant}.{IMAGE_VARIANT_FORMAT}"
+
+
+def make_variants(data: bytes) -> dict[str, bytes]:
+    """Creates width-bounded variants of image. Returns empty dict if data is
+    not a valid image"""
+    try:
+        with Image.open(BytesIO(data)) as original:
+            image = ImageOps.exif_transpose(original)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGB")
+            variants: dict[str, bytes] = {}
+            for variant, max_width in IMAGE_VARIANTS.items():
+                resized = image.copy()
+                resized.thumbnail((max_width, max_width * 10))
+                output = BytesIO()
+                resized.save(output, format=IMAGE_VARIANT_FORMAT, quality=80)
+                variants[variant] = output.getvalue()
+            return variants
+    except (OSError, ValueError):
+        return {}
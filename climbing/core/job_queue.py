@@ -0,0 +1,128 @@
+import asyncio
+from contextlib import suppress
+from datetime import timedelta
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlmodel import col
+
+from climbing.db.models.job import Job, JobStatus
+from climbing.db.session import async_session_maker
+
+JobHandler = Callable[[dict[str, Any]], Awaitable[None]]
+
+SEND_MAIL_JOB = "send_mail"
+REMOVE_STORAGE_OBJECTS_JOB = "remove_storage_objects"
+REFRESH_RATING_JOB = "refresh_rating"
+
+# Key of Session.info which is set when jobs are added in current transaction
+ENQUEUED_JOBS_KEY = "enqueued_jobs"
+
+
+class JobQueue:
+    """Queue of background jobs stored in job table. Jobs are added in the
+    same transaction as changes which caused them, so they are neither lost
+    nor executed for rolled back changes. Jobs are executed by workers from
+    climbing.util.job_workers"""
+
+    _handlers: dict[str, JobHandler]
+    _scrubbed_kinds: set[str]
+    _wakeup: asyncio.Event | None
+
+    def __init__(self) -> None:
+        self._handlers = {}
+        self._scrubbed_kinds = set()
+        self._wakeup = None
+
+    def handler(
+        self, kind: str, scrub_failed: bool = False
+    ) -> Callable[[JobHandler], JobHandler]:
+        """Registers decorated coroutine function as handler of jobs of kind.
+        Handler receives job payload and must be idempotent, because job is
+        executed again if it fails or worker stops before job is completed.
+        With scrub_failed payload of failed jobs isn't kept, which is
+        required for payloads with secrets"""
+
+        def register(func: JobHandler) -> JobHandler:
+            if kind in self._handlers:
+                raise ValueError(f"Handler of {kind} jobs is already registered")
+            self._handlers[kind] = func
+            if scrub_failed:
+                self._scrubbed_kinds.add(kind)
+            return func
+
+        return register
+
+    def get_handler(self, kind: str) -> JobHandler | None:
+        return self._handlers.get(kind)
+
+    def scrubs_failed(self, kind: str) -> bool:
+        return kind in self._scrubbed_kinds
+
+    async def enqueue(
+        self,
+        session: AsyncSession,
+        kind: str,
+        payload: dict[str, Any] | None = None,
+        unique: bool = False,
+        delay: timedelta | None = None,
+    ) -> None:
+        """Adds job without committing session. Workers are woken up after
+        commit. With unique job isn't added if the same job is already
+        pending. Job doesn't start earlier than delay after adding"""
+        payload = payload or {}
+        if unique:
+            pending_payloads = await session.scalars(
+                select(col(Job.payload))
+                .where(col(Job.kind) == kind)
+                .where(col(Job.status) == JobStatus.PENDING)
+            )
+            if payload in pending_payloads.all():
+                return
+        new_job = Job(kind=kind, payload=payload)
+        if delay is not None:
+            new_job.run_after += delay
+        session.add(new_job)
+        session.info[ENQUEUED_JOBS_KEY] = True
+
+    async def submit(
+        self,
+        kind: str,
+        payload: dict[str, Any] | None = None,
+        unique: bool = False,
+        delay: timedelta | None = None,
+    ) -> None:
+        """Adds job in separate transaction. Used when changes which caused
+        the job are already committed"""
+        async with async_session_maker() as session:
+            await self.enqueue(session, kind, payload, unique, delay)
+            await session.commit()
+
+    def wake(self) -> None:
+        """Wakes up idle workers of this process to check for new jobs"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def wait(self, timeout: timedelta) -> None:
+        """Waits until jobs are added by this process or timeout expires"""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._wakeup.wait(), timeout.total_seconds())
+        self._wakeup.clear()
+
+
+job_queue = JobQueue()
+
+
+@event.listens_for(Session, "after_commit")
+def wake_workers(session: Session) -> None:
+    if session.info.pop(ENQUEUED_JOBS_KEY, False):
+        job_queue.wake()
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_enqueued_jobs(session: Session) -> None:
+    session.info.pop(ENQUEUED_JOBS_KEY, None)
@@ -0,0 +1,37 @@
+import smtplib
+from email.mime.text import MIMEText
+from typing import Any
+
+from fastapi.concurrency import run_in_threadpool
+
+from climbing.core.config import settings
+from climbing.core.job_queue import SEND_MAIL_JOB, job_queue
+
+
+def send_mail(to: str, subject: str, text: str) -> None:
+    """Sends plain text email. Blocks until SMTP server accepts message"""
+    smtp_class = smtplib.SMTP_SSL if settings.MAIL_USE_SSL else smtplib.SMTP
+    with smtp_class(
+        settings.MAIL_SMTP_HOST,
+        settings.MAIL_SMTP_PORT,
+        timeout=settings.MAIL_SMTP_TIMEOUT.total_seconds(),
+    ) as server:
+        # Local SMTP servers usually don't require authentication
+        if settings.MAIL_EXTERNAL_APP_PASSWORD != "":
+            server.login(settings.MAIL_USERNAME, settings.MAIL_EXTERNAL_APP_PASSWORD)
+        msg = MIMEText(text)
+        msg["Subject"] = subject
+        server.send_message(msg, from_addr=settings.MAIL_USERNAME, to_addrs=to)
+
+
+# Payload contains text of the email, e.g. password reset token
+@job_queue.handler(SEND_MAIL_JOB, scrub_failed=True)
+async def send_mail_job(payload: dict[str, Any]) -> None:
+    await run_in_threadpool(
+        send_mail, payload["to"], payload["subject"], payload["text"]
+    )
+
+
+async def send_mail_later(to: str, subject: str, text: str) -> None:
+    """Enqueues email to be sent by background job worker"""
+    await job_queue.submit(SEND_MAIL_JOB, {"to": to, "subject": subject, "text": text})
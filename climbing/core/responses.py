@@ -69,3 +69,4 @@ INTEGRITY_ERROR = ResponseModel(
 INCOMPLETE_FILE_SENT = ResponseModel(
     400, "Either Content-Type or Content-Length headers not set"
 )
+INVALID_CURSOR = ResponseModel(400, "Invalid pagination cursor")
@@ -1,3 +1,5 @@
+from dateutil.relativedelta import relativedelta
+
 from climbing.db.models.category import Category
 
 category_to_score_map: dict[Category, float] = {
@@ -18,3 +20,7 @@ place_to_score_map: dict[int, float] = {
     **{10 + i: 32 - i * 2 for i in range(12)},
     **{22 + i: 9 - i for i in range(9)},
 }
+
+# Period of time before rating's end date in which ascents and competitions are
+# taken into account
+rating_period = relativedelta(months=1, days=15)
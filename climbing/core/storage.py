@@ -0,0 +1,194 @@
+import os
+import shutil
+from datetime import datetime, timezone
+from functools import cache
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, NamedTuple
+
+import certifi
+from minio import Minio, S3Error
+from minio.deleteobjects import DeleteObject
+from urllib3 import PoolManager, Retry, Timeout
+
+from climbing.core.config import settings
+
+
+class ObjectInfo(NamedTuple):
+    """Stored object description"""
+
+    name: str
+    size: int
+    last_modified: datetime
+
+
+class StorageBackend:
+    """Base class for synchronous object storage backends. Methods are called
+    by FileStorage from worker threads"""
+
+    def prepare(self) -> None:
+        """Prepares storage for use. Called once at application startup"""
+
+    def put(self, name: str, data: BinaryIO, length: int, content_type: str) -> None:
+        raise NotImplementedError()
+
+    def remove(self, name: str) -> None:
+        raise NotImplementedError()
+
+    def remove_batch(self, names: Iterable[str]) -> list[str]:
+        """Removes objects in one request if possible. Returns names of
+        objects which were not removed"""
+        failed: list[str] = []
+        for name in names:
+            try:
+                self.remove(name)
+            except (OSError, S3Error):
+                failed.append(name)
+        return failed
+
+    def exists(self, name: str) -> bool:
+        raise NotImplementedError()
+
+    def list(self, prefix: str = "") -> Iterator[ObjectInfo]:
+        """Lazily yields all objects with names starting with prefix"""
+        raise NotImplementedError()
+
+
+class MinioStorageBackend(StorageBackend):
+    """Storage backend which keeps objects in Minio bucket"""
+
+    client: Minio
+    bucket_name: str
+
+    def __init__(self, client: Minio, bucket_name: str) -> None:
+        self.client = client
+        self.bucket_name = bucket_name
+
+    def prepare(self) -> None:
+        if not self.client.bucket_exists(self.bucket_name):
+            self.client.make_bucket(self.bucket_name)
+
+    def put(self, name: str, data: BinaryIO, length: int, content_type: str) -> None:
+        self.client.put_object(
+            bucket_name=self.bucket_name,
+            content_type=content_type,
+            object_name=name,
+            data=data,
+            length=length,
+        )
+
+    def remove(self, name: str) -> None:
+        self.client.remove_object(self.bucket_name, name)
+
+    def remove_batch(self, names: Iterable[str]) -> list[str]:
+        errors = self.client.remove_objects(
+            self.bucket_name, (DeleteObject(name) for name in names)
+        )
+        return [error.name for error in errors]
+
+    def exists(self, name: str) -> bool:
+        try:
+            self.client.stat_object(self.bucket_name, name)
+            return True
+        except S3Error:
+            return False
+
+    def list(self, prefix: str = "") -> Iterator[ObjectInfo]:
+        for obj in self.client.list_objects(
+            bucket_name=self.bucket_name, prefix=prefix, recursive=True
+        ):
+            if obj.object_name is not None and not obj.is_dir:
+                yield ObjectInfo(
+                    obj.object_name,
+                    obj.size or 0,
+                    obj.last_modified or datetime.now(timezone.utc),
+                )
+
+
+class LocalStorageBackend(StorageBackend):
+    """Storage backend which keeps objects in local directory. Used for
+    development and tests instead of Minio"""
+
+    root: Path
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def _path(self, name: str) -> Path:
+        path = (self.root / name).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Object name {name} is outside of storage root")
+        return path
+
+    def prepare(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def put(self, name: str, data: BinaryIO, length: int, content_type: str) -> None:
+        path = self._path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as file:
+            shutil.copyfileobj(data, file)
+
+    def remove(self, name: str) -> None:
+        # Missing objects are ignored like in S3, so removal can be retried
+        self._path(name).unlink(missing_ok=True)
+
+    def exists(self, name: str) -> bool:
+        return self._path(name).is_file()
+
+    def list(self, prefix: str = "") -> Iterator[ObjectInfo]:
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = Path(directory, filename)
+                name = path.relative_to(self.root).as_posix()
+                if name.startswith(prefix):
+                    stat = path.stat()
+                    yield ObjectInfo(
+                        name,
+                        stat.st_size,
+                        datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+                    )
+
+
+@cache
+def media_base_url() -> str:
+    """Returns public URL of storage bucket. Built once per process"""
+    return (
+        f"{settings.MINIO_URL_SCHEME}://{settings.MINIO_HOST}/"
+        f"{settings.MINIO_BUCKET_NAME}/"
+    )
+
+
+def absolute_media_url(name: str) -> str:
+    """Returns public URL of stored object. Already absolute URLs are kept
+    as is"""
+    if "://" in name:
+        return name
+    return media_base_url() + name
+
+
+@cache
+def get_storage_backend() -> StorageBackend:
+    """Returns process-wide storage backend selected by STORAGE_BACKEND
+    setting. Minio backend shares one client with a connection pool"""
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorageBackend(settings.MEDIA_ROOT)
+    return MinioStorageBackend(
+        Minio(
+            endpoint=settings.MINIO_HOST,
+            access_key=settings.MINIO_ACCESS_KEY,
+            secret_key=settings.MINIO_SECRET_KEY,
+            # Same as Minio's default client, but with configurable pool size
+            http_client=PoolManager(
+                timeout=Timeout(connect=300, read=300),
+                maxsize=settings.STORAGE_MAX_CONNECTIONS,
+                cert_reqs="CERT_REQUIRED",
+                ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+                retries=Retry(
+                    total=5,
+                    backoff_factor=0.2,
+                    status_forcelist=[500, 502, 503, 504],
+                ),
+            ),
+        ),
+        settings.MINIO_BUCKET_NAME,
+    )
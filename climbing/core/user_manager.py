@@ -1,5 +1,3 @@
-import smtplib
-from email.mime.text import MIMEText
 from typing import Annotated, Any
 from uuid import UUID
 
@@ -10,9 +8,12 @@ from fastapi_users.exceptions import UserAlreadyExists
 from fastapi_users.manager import BaseUserManager, UUIDIDMixin
 
 from climbing.core.config import settings
+from climbing.core.mail import send_mail_later
+from climbing.crud.crud_rating_snapshot import rating_snapshot
 from climbing.db.models import User, UserCreate
 from climbing.db.session import get_user_db
 from climbing.db.user_database import UserDatabase
+from climbing.util.rating_cache import invalidate_rating
 
 
 class UserManager(UUIDIDMixin, BaseUserManager[User, UUID]):
@@ -108,6 +109,8 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, UUID]):
         validated_update_dict = {}
         for field, value in update_dict.items():
             await self._update_field(validated_update_dict, user, field, value)
+        # Snapshots are deleted in the transaction committed by user_db.update
+        await rating_snapshot.invalidate(self.user_db.session)
         return await self.user_db.update(user, validated_update_dict)
 
     async def _update_field(
@@ -137,21 +140,33 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, UUID]):
             )
         return await super().validate_password(password, user)
 
+    async def delete(self, user: User, request: Request | None = None) -> None:
+        # Snapshots are deleted in the transaction committed by user_db.delete
+        await rating_snapshot.invalidate(self.user_db.session)
+        return await super().delete(user, request)
+
+    async def on_after_update(
+        self,
+        user: User,
+        update_dict: dict[str, Any],
+        request: Request | None = None,
+    ) -> None:
+        await invalidate_rating()
+        return await super().on_after_update(user, update_dict, request)
+
+    async def on_after_delete(self, user: User, request: Request | None = None) -> None:
+        await invalidate_rating()
+        return await super().on_after_delete(user, request)
+
     async def on_after_forgot_password(
         self, user: User, token: str, request: Request | None = None
     ) -> None:
-        server = smtplib.SMTP_SSL(settings.MAIL_SMTP_HOST, settings.MAIL_SMTP_PORT)
-        server.login(settings.MAIL_USERNAME, settings.MAIL_EXTERNAL_APP_PASSWORD)
-        msg = MIMEText(
+        await send_mail_later(
+            user.email,
+            "Сброс пароля",
             f"""Для сброса пароля пройдите по ссылке: https://climbing.ae-mc.ru/#/password-reset/{token}
 Или введите токен сброса пароля вручную:
-{token}"""
-        )
-        msg["Subject"] = "Сброс пароля"
-        server.send_message(
-            msg,
-            from_addr=settings.MAIL_USERNAME,
-            to_addrs=user.email,
+{token}""",
         )
         return await super().on_after_forgot_password(user, token, request)
 
@@ -1,11 +1,19 @@
 from .crud_ascent import ascent
 from .crud_competition import competition
 from .crud_competition_participant import competition_participant
+from .crud_job import job
+from .crud_rating_snapshot import rating_snapshot
 from .crud_route import route
+from .crud_storage_object import storage_object
+from .crud_user import user
 
 __all__ = [
     "ascent",
     "competition",
     "competition_participant",
+    "job",
+    "rating_snapshot",
     "route",
+    "storage_object",
+    "user",
 ]
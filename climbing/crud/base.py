@@ -8,6 +8,9 @@ from sqlalchemy.orm import selectinload
 from sqlalchemy.sql.selectable import Select
 from sqlmodel import SQLModel
 
+from climbing.schemas.filters.pagination import Pagination
+from climbing.util.pagination import paginate
+
 ModelType = TypeVar("ModelType", bound=SQLModel)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=SQLModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=SQLModel)
@@ -18,17 +21,40 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     Read, Update, Delete (CRUD) operations."""
 
     model: Type[ModelType]
+    # Loader options used when load plan is not specified
     select_options: list = [selectinload("*")]
+    # Named loader option sets. Each set loads exactly the relationships which
+    # are serialized by some response schema
+    load_plans: dict[str, list] = {}
+    # Column used together with id for keyset pagination
+    pagination_column: str | None = "created_at"
 
     def __init__(self, model: Type[ModelType]) -> None:
         self.model = model
 
-    async def get(self, session: AsyncSession, row_id: UUID4) -> ModelType | None:
+    def options(self, load_plan: str | None = None) -> list:
+        """Returns loader options of load plan
+
+        Args:
+            load_plan (str | None): name of load plan from load_plans. If None,
+                select_options are returned
+
+        Returns:
+            list: loader options
+        """
+        if load_plan is None:
+            return self.select_options
+        return self.load_plans[load_plan]
+
+    async def get(
+        self, session: AsyncSession, row_id: UUID4, load_plan: str | None = None
+    ) -> ModelType | None:
         """Get single row by id
 
         Args:
             session (Session): database connection
             row_id (UUID4): row id
+            load_plan (str | None): name of load plan
 
         Returns:
             ModelType | None: row with id == row_id. Could be None
@@ -37,7 +63,7 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             await session.execute(
                 select(self.model)
                 .where(self.model.id == row_id)
-                .options(*self.select_options)
+                .options(*self.options(load_plan))
             )
         ).scalar_one_or_none()
 
@@ -46,20 +72,39 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         session: AsyncSession,
         query_modifier: Callable[[Select[tuple[ModelType]]], Select[tuple[ModelType]]]
         | None = None,
+        pagination: Pagination | None = None,
+        descending: bool = True,
+        load_plan: str | None = None,
     ) -> Sequence[ModelType]:
         """Get all rows
 
         Args:
             session (Session): database connection
+            pagination (Pagination | None): page size and cursor. If set, rows
+                are ordered by (pagination_column, id)
+            descending (bool): order of rows if pagination is set
+            load_plan (str | None): name of load plan
 
         Returns:
             list[ModelType]: list of rows
         """
         query: Select[tuple[ModelType]] = select(self.model).options(
-            *self.select_options
+            *self.options(load_plan)
         )
         if query_modifier is not None:
             query = query_modifier(query)
+        if pagination is not None:
+            query = paginate(
+                query,
+                pagination,
+                id_column=getattr(self.model, "id"),
+                order_column=(
+                    getattr(self.model, self.pagination_column)
+                    if self.pagination_column is not None
+                    else None
+                ),
+                descending=descending,
+            )
 
         return (await session.execute(query)).scalars().all()
 
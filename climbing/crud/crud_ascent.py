@@ -1,19 +1,44 @@
 from datetime import datetime
-from typing import Sequence
+from typing import Any, Sequence
 
 from pydantic import UUID4
+from sqlalchemy import delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
 from sqlmodel import col
 
-from climbing.db.models import Ascent, AscentCreate, AscentUpdate
+from climbing.db.models import (
+    Ascent,
+    AscentCreate,
+    AscentUpdate,
+    LatestAscent,
+    Route,
+)
+from climbing.db.session import upsert
 
 from .base import CRUDBase
+from .crud_rating_snapshot import rating_snapshot
 
 
 class CRUDAscent(CRUDBase[Ascent, AscentCreate, AscentUpdate]):
     """CRUD class for ascent models"""
 
+    pagination_column = "date"
+    # AscentReadWithAll
+    select_options = [
+        selectinload(Ascent.route).selectinload(Route.author),
+        selectinload(Ascent.route).selectinload(Route.images),
+        selectinload(Ascent.user),
+    ]
+    load_plans = {
+        # AscentReadWithRoute
+        "with_route": [
+            selectinload(Ascent.route).selectinload(Route.author),
+            selectinload(Ascent.route).selectinload(Route.images),
+        ],
+    }
+
     async def get_for_user(
         self,
         session: AsyncSession,
@@ -35,5 +60,90 @@ class CRUDAscent(CRUDBase[Ascent, AscentCreate, AscentUpdate]):
 
         return (await session.execute(statement)).scalars().all()
 
+    async def refresh_latest(
+        self, session: AsyncSession, *pairs: tuple[UUID4, UUID4]
+    ) -> None:
+        """Обновление записей о последнем подъёме для пар (user_id, route_id).
+        Изменения не фиксируются, чтобы выполняться в одной транзакции с
+        изменением подъёмов, которые должны быть уже отправлены в базу. Запись
+        вставляется через INSERT ... ON CONFLICT, поэтому параллельные
+        транзакции для одной пары не нарушают первичный ключ"""
+        for user_id, route_id in set(pairs):
+            latest_id = (
+                await session.execute(
+                    select(Ascent.id)
+                    .where(col(Ascent.user_id) == user_id)
+                    .where(col(Ascent.route_id) == route_id)
+                    .order_by(col(Ascent.date).desc())
+                    .limit(1)
+                )
+            ).scalar_one_or_none()
+            if latest_id is None:
+                await session.execute(
+                    delete(LatestAscent)
+                    .where(col(LatestAscent.user_id) == user_id)
+                    .where(col(LatestAscent.route_id) == route_id)
+                )
+                continue
+            statement = upsert(session, LatestAscent).values(
+                user_id=user_id, route_id=route_id, ascent_id=latest_id
+            )
+            await session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[
+                        col(LatestAscent.user_id),
+                        col(LatestAscent.route_id),
+                    ],
+                    set_={"ascent_id": statement.excluded.ascent_id},
+                )
+            )
+
+    async def create(self, session: AsyncSession, entity: AscentCreate) -> Ascent:
+        db_entity = self.model(**entity.model_dump())
+        session.add(db_entity)
+        await session.flush()
+        await self.refresh_latest(session, (db_entity.user_id, db_entity.route_id))
+        # Список пролазов в рейтинге не ограничен периодом рейтинга, поэтому
+        # изменение любого пролаза затрагивает все сохранённые рейтинги
+        await rating_snapshot.invalidate(session)
+        await session.commit()
+        result = await self.get(session, db_entity.id)
+        assert result is not None
+        return result
+
+    async def update(
+        self,
+        session: AsyncSession,
+        *,
+        db_entity: Ascent,
+        new_entity: AscentUpdate | dict[str, Any],
+    ) -> Ascent:
+        old_pair = (db_entity.user_id, db_entity.route_id)
+        if isinstance(new_entity, dict):
+            update_data = new_entity
+        else:
+            update_data = new_entity.model_dump(exclude_unset=True)
+        db_entity.sqlmodel_update(update_data)
+        session.add(db_entity)
+        await session.flush()
+        await self.refresh_latest(
+            session, old_pair, (db_entity.user_id, db_entity.route_id)
+        )
+        await rating_snapshot.invalidate(session)
+        await session.commit()
+        result = await self.get(session, db_entity.id)
+        assert result is not None
+        return result
+
+    async def remove(self, session: AsyncSession, *, row_id: UUID4) -> Ascent | None:
+        result = await session.get(self.model, row_id)
+        if result is not None:
+            await session.delete(result)
+            await session.flush()
+            await self.refresh_latest(session, (result.user_id, result.route_id))
+            await rating_snapshot.invalidate(session)
+            await session.commit()
+        return result
+
 
 ascent = CRUDAscent(Ascent)
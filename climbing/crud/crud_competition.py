@@ -1,4 +1,4 @@
-from typing import Sequence
+from typing import Any, Sequence
 
 from pydantic import UUID4
 from sqlalchemy import select
@@ -7,6 +7,7 @@ from sqlalchemy.orm import selectinload
 from sqlmodel import col
 
 from climbing.crud.base import CRUDBase
+from climbing.crud.crud_rating_snapshot import rating_snapshot
 from climbing.db.models.competition import (
     Competition,
     CompetitionCreate,
@@ -21,12 +22,27 @@ from climbing.db.models.competition_participant import (
 class CRUDCompetition(CRUDBase[Competition, CompetitionCreate, CompetitionUpdate]):
     """CRUD class for competition models"""
 
+    # CompetitionReadWithAll
+    select_options = [
+        selectinload(col(Competition.participants)).selectinload(  # type: ignore
+            CompetitionParticipant.user
+        ),
+        selectinload(Competition.organizer),
+    ]
+    load_plans = {
+        # CompetitionRead
+        "plain": [],
+    }
+
     async def add_participant(
         self, session: AsyncSession, entity: CompetitionParticipantCreate
     ) -> CompetitionParticipant:
         """Add participant to existing competition"""
         db_entity = CompetitionParticipant(**entity.dict())
         session.add(db_entity)
+        competition = await session.get(Competition, entity.competition_id)
+        if competition is not None:
+            await rating_snapshot.invalidate(session, competition.date)
         await session.commit()
         return (
             await session.execute(
@@ -54,22 +70,43 @@ class CRUDCompetition(CRUDBase[Competition, CompetitionCreate, CompetitionUpdate
             )
         )
         session.add(db_entity)
+        await rating_snapshot.invalidate(session, entity.date)
         await session.commit()
         result = await self.get(session, db_entity.id)
         assert result is not None
         return result
 
+    async def update(
+        self,
+        session: AsyncSession,
+        *,
+        db_entity: Competition,
+        new_entity: CompetitionUpdate | dict[str, Any],
+    ) -> Competition:
+        if isinstance(new_entity, dict):
+            new_date = new_entity.get("date", db_entity.date)
+        else:
+            new_date = new_entity.model_dump(exclude_unset=True).get(
+                "date", db_entity.date
+            )
+        # Snapshots are deleted before super().update commits the change
+        await rating_snapshot.invalidate(session, db_entity.date, new_date)
+        return await super().update(session, db_entity=db_entity, new_entity=new_entity)
+
+    async def remove(
+        self, session: AsyncSession, *, row_id: UUID4
+    ) -> Competition | None:
+        competition = await session.get(self.model, row_id)
+        if competition is not None:
+            await rating_snapshot.invalidate(session, competition.date)
+        return await super().remove(session, row_id=row_id)
+
     async def get_for_organizer(
         self, session: AsyncSession, user_id: UUID4
     ) -> Sequence[Competition]:
         query = (
             select(Competition)
-            .options(
-                selectinload(col(Competition.participants)).selectinload(  # type: ignore
-                    CompetitionParticipant.user
-                ),
-                selectinload(Competition.organizer),
-            )
+            .options(*self.select_options)
             .where(col(Competition.organizer_id) == user_id)
         )
         return (await session.execute(query)).scalars().all()
@@ -1,4 +1,11 @@
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
 from climbing.crud.base import CRUDBase
+from climbing.crud.crud_rating_snapshot import rating_snapshot
+from climbing.db.models.competition import Competition
 from climbing.db.models.competition_participant import (
     CompetitionParticipant,
     CompetitionParticipantCreate,
@@ -15,5 +22,28 @@ class CRUDCompetitionParticipant(
 ):
     """CRUD class for competition participations"""
 
+    # CompetitionParticipantReadWithAll
+    select_options = [
+        selectinload(CompetitionParticipant.competition),
+        selectinload(CompetitionParticipant.user),
+    ]
+    load_plans = {
+        # CompetitionParticipantRead
+        "plain": [],
+    }
+
+    async def update(
+        self,
+        session: AsyncSession,
+        *,
+        db_entity: CompetitionParticipant,
+        new_entity: CompetitionParticipantUpdate | dict[str, Any],
+    ) -> CompetitionParticipant:
+        # Snapshots are deleted before super().update commits the change
+        competition = await session.get(Competition, db_entity.competition_id)
+        if competition is not None:
+            await rating_snapshot.invalidate(session, competition.date)
+        return await super().update(session, db_entity=db_entity, new_entity=new_entity)
+
 
 competition_participant = CRUDCompetitionParticipant(CompetitionParticipant)
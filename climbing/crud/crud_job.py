@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col
+
+from climbing.crud.base import CRUDBase
+from climbing.db.models.job import Job, JobStatus
+
+
+def _runnable(now: datetime):
+    # Running job with expired lock belongs to worker which was stopped
+    return or_(
+        (col(Job.status) == JobStatus.PENDING) & (col(Job.run_after) <= now),
+        (col(Job.status) == JobStatus.RUNNING) & (col(Job.locked_until) < now),
+    )
+
+
+def _owned(job: Job):
+    # Number of attempts is increased by every claim, so it identifies the
+    # worker which holds the job now
+    return (
+        (col(Job.id) == job.id)
+        & (col(Job.status) == JobStatus.RUNNING)
+        & (col(Job.attempts) == job.attempts)
+    )
+
+
+class CRUDJob(CRUDBase[Job, Job, Job]):
+    """CRUD class used by background job workers. Jobs are added by
+    JobQueue.enqueue, so that CRUD modules can add jobs without import
+    cycles. Changes of claimed job are applied only while the worker still
+    holds it"""
+
+    async def claim(self, session: AsyncSession, lease: timedelta) -> Job | None:
+        """Захват задачи, готовой к выполнению, на время lease. Захват
+        выполняется условным UPDATE, поэтому задачу получает только один
+        обработчик, даже если их запущено несколько в разных процессах"""
+        now = datetime.now(timezone.utc)
+        candidates = (
+            (
+                await session.execute(
+                    select(col(Job.id))
+                    .where(_runnable(now))
+                    .order_by(col(Job.run_after))
+                    .limit(10)
+                )
+            )
+            .scalars()
+            .all()
+        )
+        for job_id in candidates:
+            result = await session.execute(
+                update(Job)
+                .where(col(Job.id) == job_id)
+                .where(_runnable(now))
+                .values(
+                    status=JobStatus.RUNNING,
+                    attempts=col(Job.attempts) + 1,
+                    locked_until=now + lease,
+                )
+            )
+            await session.commit()
+            if result.rowcount == 1:  # type: ignore[attr-defined]
+                return await session.get(Job, job_id, populate_existing=True)
+        return None
+
+    async def extend_lease(
+        self, session: AsyncSession, job: Job, lease: timedelta
+    ) -> bool:
+        """Продление захвата задачи на lease от текущего момента. Возвращает
+        False, если задача уже захвачена другим обработчиком"""
+        result = await session.execute(
+            update(Job)
+            .where(_owned(job))
+            .values(locked_until=datetime.now(timezone.utc) + lease)
+        )
+        await session.commit()
+        return result.rowcount == 1  # type: ignore[attr-defined]
+
+    async def complete(self, session: AsyncSession, job: Job) -> None:
+        """Удаление выполненной задачи"""
+        await session.execute(delete(Job).where(_owned(job)))
+        await session.commit()
+
+    async def retry(
+        self, session: AsyncSession, job: Job, error: str, delay: timedelta
+    ) -> None:
+        """Возврат задачи в очередь после неудачной попытки"""
+        await session.execute(
+            update(Job)
+            .where(_owned(job))
+            .values(
+                status=JobStatus.PENDING,
+                run_after=datetime.now(timezone.utc) + delay,
+                locked_until=None,
+                last_error=error,
+            )
+        )
+        await session.commit()
+
+    async def fail(
+        self, session: AsyncSession, job: Job, error: str, scrub: bool = False
+    ) -> None:
+        """Отметка задачи, исчерпавшей попытки или не имеющей обработчика.
+        С scrub данные задачи удаляются"""
+        values: dict[str, Any] = {
+            "status": JobStatus.FAILED,
+            "locked_until": None,
+            "last_error": error,
+        }
+        if scrub:
+            values["payload"] = {}
+        await session.execute(update(Job).where(_owned(job)).values(**values))
+        await session.commit()
+
+
+job = CRUDJob(Job)
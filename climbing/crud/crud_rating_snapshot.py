@@ -0,0 +1,120 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col
+
+from climbing.core.score_maps import rating_period
+from climbing.crud.base import CRUDBase
+from climbing.db.data_version import data_versions
+from climbing.db.models.rating_snapshot import RatingSnapshot, RatingSnapshotHeader
+from climbing.schemas.filters.rating_filter import RatingFilter
+from climbing.schemas.score import Score
+
+
+class CRUDRatingSnapshot(CRUDBase[RatingSnapshot, RatingSnapshot, RatingSnapshot]):
+    """CRUD class for precomputed ratings"""
+
+    async def get_scores(
+        self,
+        session: AsyncSession,
+        day: date,
+        versions: dict[str, int],
+        rating_filter: RatingFilter | None = None,
+    ) -> list[Score] | None:
+        """Получение сохранённого рейтинга на конец дня day, рассчитанного по
+        данным версий versions. Возвращает None, если такой рейтинг ещё не
+        рассчитан"""
+        filter_key = (rating_filter or RatingFilter()).key
+        header = await session.execute(
+            select(col(RatingSnapshotHeader.day))
+            .where(col(RatingSnapshotHeader.day) == day)
+            .where(col(RatingSnapshotHeader.filter_key) == filter_key)
+            .where(
+                col(RatingSnapshotHeader.data_version) == data_versions.key(versions)
+            )
+        )
+        if header.first() is None:
+            return None
+        rows = (
+            (
+                await session.execute(
+                    select(RatingSnapshot.data)
+                    .where(col(RatingSnapshot.day) == day)
+                    .where(col(RatingSnapshot.filter_key) == filter_key)
+                    .order_by(col(RatingSnapshot.place))
+                )
+            )
+            .scalars()
+            .all()
+        )
+        return [Score.model_validate_json(data) for data in rows]
+
+    async def store(
+        self,
+        session: AsyncSession,
+        day: date,
+        versions: dict[str, int],
+        rating_filter: RatingFilter | None,
+        scores: list[Score],
+    ) -> None:
+        """Сохранение рейтинга на конец дня day, рассчитанного по данным версий
+        versions. Версии должны быть прочитаны до расчёта. Рейтинг не
+        сохраняется, если данные изменились после чтения версий или если его
+        уже сохранил параллельный запрос"""
+        if await data_versions.versions(session, versions) != versions:
+            return
+        filter_key = (rating_filter or RatingFilter()).key
+        for model in (RatingSnapshot, RatingSnapshotHeader):
+            await session.execute(
+                delete(model)
+                .where(col(model.day) == day)
+                .where(col(model.filter_key) == filter_key)
+            )
+        # Изменение, зафиксированное после проверки версий, не даст
+        # использовать рейтинг, так как отметка хранит ключ прежних версий
+        session.add(
+            RatingSnapshotHeader(
+                day=day,
+                filter_key=filter_key,
+                data_version=data_versions.key(versions),
+            )
+        )
+        session.add_all(
+            RatingSnapshot(
+                day=day,
+                filter_key=filter_key,
+                user_id=score.user.id,
+                place=score.place,
+                data=score.model_dump_json(),
+            )
+            for score in scores
+        )
+        try:
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+
+    async def invalidate(
+        self, session: AsyncSession, *changed_dates: date | datetime
+    ) -> None:
+        """Удаление сохранённых рейтингов, на которые влияют изменения данных
+        за даты changed_dates. Если даты не переданы, удаляются все рейтинги.
+        Изменения не фиксируются: удаление должно выполняться в транзакции,
+        изменяющей данные, иначе между ними может быть прочитан устаревший
+        рейтинг"""
+        for model in (RatingSnapshot, RatingSnapshotHeader):
+            query = delete(model)
+            if len(changed_dates) > 0:
+                days = [
+                    changed.date() if isinstance(changed, datetime) else changed
+                    for changed in changed_dates
+                ]
+                query = query.where(col(model.day) >= min(days)).where(
+                    col(model.day) <= max(days) + rating_period + timedelta(days=1)
+                )
+            await session.execute(query)
+
+
+rating_snapshot = CRUDRatingSnapshot(RatingSnapshot)
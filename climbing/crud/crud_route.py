@@ -1,19 +1,36 @@
+import asyncio
 from typing import Any, Sequence
 
 from fastapi import UploadFile
 from pydantic import UUID4
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
 
-from climbing.api.deps import FileStorage
+from climbing.api.deps import FileStorage, StoredFile
 from climbing.db.models import Route, RouteCreate, RouteImage, RouteUpdate
 
 from .base import CRUDBase
+from .crud_rating_snapshot import rating_snapshot
+from .crud_storage_object import storage_object as crud_storage_object
+
+IMAGES_PREFIX = "routes_images/"
 
 
 class CRUDRoute(CRUDBase[Route, RouteCreate, RouteUpdate]):
     """CRUD class for route models"""
 
+    # RouteReadWithAll
+    select_options = [selectinload(Route.author), selectinload(Route.images)]
+    load_plans = {
+        # RouteRead
+        "plain": [],
+        # RouteReadWithAuthor
+        "with_author": [selectinload(Route.author)],
+        # RouteReadWithImages
+        "with_images": [selectinload(Route.images)],
+    }
+
     async def get_for_user(
         self, session: AsyncSession, user_id: UUID4
     ) -> Sequence[Route]:
@@ -31,6 +48,41 @@ class CRUDRoute(CRUDBase[Route, RouteCreate, RouteUpdate]):
             .all()
         )
 
+    async def _store_images(
+        self,
+        session: AsyncSession,
+        storage: FileStorage,
+        images: list[UploadFile],
+        digests: list[str],
+    ) -> list[StoredFile]:
+        """Uploads images which are not stored yet. Images with content that is
+        already stored are not uploaded again. Uploads of failed requests are
+        removed by garbage collection
+
+        Returns:
+            list[StoredFile]: all images in the same order as images
+        """
+        names = [
+            storage.image_name(image, digest, IMAGES_PREFIX)
+            for image, digest in zip(images, digests)
+        ]
+        existing = await crud_storage_object.get_existing(session, names)
+        to_upload: dict[str, tuple[UploadFile, str]] = {}
+        for image, digest, name in zip(images, digests, names):
+            if name not in existing:
+                to_upload.setdefault(name, (image, digest))
+        uploaded = await storage.save_images(
+            [image for image, _ in to_upload.values()],
+            prefix=IMAGES_PREFIX,
+            digests=[digest for _, digest in to_upload.values()],
+        )
+        uploaded_by_name = {file.name: file for file in uploaded}
+        return [
+            uploaded_by_name.get(name)
+            or StoredFile(name, existing[name].has_variants, digest)
+            for name, digest in zip(names, digests)
+        ]
+
     async def update(
         self,
         session: AsyncSession,
@@ -39,29 +91,63 @@ class CRUDRoute(CRUDBase[Route, RouteCreate, RouteUpdate]):
         new_entity: RouteUpdate | dict[str, Any],
     ) -> Route:
         if isinstance(new_entity, RouteUpdate):
-            update_data = new_entity.model_dump(exclude={"images": True})
+            update_data = new_entity.model_dump(
+                exclude={"images": True, "kept_image_ids": True}
+            )
             images = new_entity.images
+            kept_image_ids = set(new_entity.kept_image_ids)
         elif isinstance(new_entity, dict):
             update_data = new_entity
-            images: list[UploadFile] = update_data.pop("images", None)
-        db_entity = await super().update(
-            session, db_entity=db_entity, new_entity=update_data
-        )
+            images: list[UploadFile] = update_data.pop("images", [])
+            kept_image_ids = set(update_data.pop("kept_image_ids", []))
         storage = FileStorage()
-        for image in db_entity.images:
-            await session.delete(image)
-            if storage.exists(image.url):
-                storage.remove(image.url)
-        db_entity.images.clear()
 
-        for image in images:
-            db_entity.images.append(
-                RouteImage(
-                    url=storage.save(image, prefix="routes_images/"),
-                    route_id=db_entity.id,
-                )
+        # Images are kept if they are listed in kept_image_ids or if the same
+        # content is sent again. Only new content is uploaded
+        existing_by_hash = {
+            image.content_hash: image
+            for image in db_entity.images
+            if image.content_hash is not None
+        }
+        kept_images = {
+            image.id: image for image in db_entity.images if image.id in kept_image_ids
+        }
+        new_images: dict[str, UploadFile] = {}
+        for image, digest in zip(
+            images, await asyncio.gather(*map(storage.digest, images))
+        ):
+            if digest in existing_by_hash:
+                kept_images[existing_by_hash[digest].id] = existing_by_hash[digest]
+            else:
+                new_images.setdefault(digest, image)
+        removed_images = [
+            image for image in db_entity.images if image.id not in kept_images
+        ]
+
+        stored = await self._store_images(
+            session, storage, list(new_images.values()), list(new_images.keys())
+        )
+        db_entity.sqlmodel_update(update_data)
+        for image in removed_images:
+            await session.delete(image)
+            db_entity.images.remove(image)
+        db_entity.images.extend(
+            RouteImage(
+                url=file.name,
+                has_variants=file.has_variants,
+                content_hash=file.digest,
+                route_id=db_entity.id,
             )
+            for file in stored
+        )
         session.add(db_entity)
+        await crud_storage_object.acquire(session, stored)
+        unreferenced = await crud_storage_object.release(
+            session,
+            (StoredFile(image.url, image.has_variants) for image in removed_images),
+        )
+        await crud_storage_object.schedule_removal(session, unreferenced)
+        await rating_snapshot.invalidate(session)
         await session.commit()
         result = await self.get(session, db_entity.id)
         assert result is not None
@@ -69,27 +155,32 @@ class CRUDRoute(CRUDBase[Route, RouteCreate, RouteUpdate]):
 
     async def create(self, session: AsyncSession, entity: RouteCreate) -> Route:
         storage = FileStorage()
-        images: list[RouteImage] = []
         entity_data = entity.model_dump(exclude={"images": True, "author": True})
+        # Images are uploaded before any database changes, so route is created
+        # only if all uploads succeeded
+        stored = await self._store_images(
+            session,
+            storage,
+            entity.images,
+            await asyncio.gather(*map(storage.digest, entity.images)),
+        )
         route_instance = self.model(**entity_data)
         session.add(route_instance)
-        await session.commit()
-        await session.refresh(route_instance, attribute_names={"id"})
-        for image in entity.images:
-            images.append(
-                RouteImage(
-                    url=storage.save(image, prefix="routes_images/"),
-                    route_id=route_instance.id,
-                )
+        session.add_all(
+            RouteImage(
+                url=file.name,
+                has_variants=file.has_variants,
+                content_hash=file.digest,
+                route_id=route_instance.id,
             )
-            session.add(images[-1])
+            for file in stored
+        )
+        await crud_storage_object.acquire(session, stored)
         await session.commit()
-        route_instance = await self.get(session, route_instance.id)
-        if route_instance is None:
-            for image in images:
-                storage.remove(image.url)
+        result = await self.get(session, route_instance.id)
+        if result is None:
             raise IndexError("Can't find created route")
-        return route_instance
+        return result
 
     async def remove(self, session: AsyncSession, *, row_id: UUID4) -> None:
         route_instance = await self.get(session, row_id)
@@ -98,17 +189,12 @@ class CRUDRoute(CRUDBase[Route, RouteCreate, RouteUpdate]):
         images = route_instance.images
         for image in images:
             await session.delete(image)
-        storage = FileStorage()
-        for image in images:
-            try:
-                storage.remove(image.url)
-            except FileNotFoundError:
-                print(
-                    f"File {image.url} associated with"
-                    f" route {route_instance.name} (id={route_instance.id})"
-                    f" not found"
-                )
+        unreferenced = await crud_storage_object.release(
+            session, (StoredFile(image.url, image.has_variants) for image in images)
+        )
+        await crud_storage_object.schedule_removal(session, unreferenced)
         await session.delete(route_instance)
+        await rating_snapshot.invalidate(session)
         await session.commit()
 
     async def archive(
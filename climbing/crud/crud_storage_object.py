@@ -0,0 +1,152 @@
+from collections import Counter, defaultdict
+from typing import Iterable
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col
+
+from climbing.api.deps import StoredFile
+from climbing.core.images import IMAGE_VARIANTS, variant_name
+from climbing.core.job_queue import REMOVE_STORAGE_OBJECTS_JOB, job_queue
+from climbing.crud.base import CRUDBase
+from climbing.db.models.route_image import RouteImage
+from climbing.db.models.storage_object import StorageObject
+from climbing.db.session import upsert
+
+
+class CRUDStorageObject(CRUDBase[StorageObject, StorageObject, StorageObject]):
+    """CRUD class for storage objects reference counters. Methods don't commit
+    changes, so they can be a part of a larger transaction"""
+
+    async def get_existing(
+        self, session: AsyncSession, names: Iterable[str]
+    ) -> dict[str, StorageObject]:
+        """Получение уже загруженных объектов с именами из names"""
+        return {
+            obj.name: obj
+            for obj in (
+                await session.execute(
+                    select(StorageObject).where(col(StorageObject.name).in_(names))
+                )
+            )
+            .scalars()
+            .all()
+        }
+
+    async def acquire(self, session: AsyncSession, files: Iterable[StoredFile]) -> None:
+        """Увеличение счётчиков ссылок на объекты files. Счётчики создаются и
+        увеличиваются одним INSERT ... ON CONFLICT, поэтому первые загрузки
+        одного объекта параллельными запросами не конфликтуют"""
+        files = list(files)
+        if len(files) == 0:
+            return
+        counts = Counter(file.name for file in files)
+        has_variants = {file.name: file.has_variants for file in files}
+        statement = upsert(session, StorageObject).values(
+            [
+                {"name": name, "ref_count": count, "has_variants": has_variants[name]}
+                for name, count in sorted(counts.items())
+            ]
+        )
+        await session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[col(StorageObject.name)],
+                set_={
+                    "ref_count": col(StorageObject.ref_count)
+                    + statement.excluded.ref_count
+                },
+            )
+        )
+
+    async def release(
+        self, session: AsyncSession, files: Iterable[StoredFile]
+    ) -> list[StoredFile]:
+        """Уменьшение счётчиков ссылок на объекты files. Возвращает объекты, на
+        которые больше не осталось ссылок и которые нужно удалить из
+        хранилища. Объекты без счётчика ссылок считаются используемыми
+        только один раз"""
+        files = list(files)
+        existing = await self.get_existing(session, (file.name for file in files))
+        unreferenced: dict[str, StoredFile] = {}
+        released_counts: Counter[str] = Counter()
+        for file in files:
+            if file.name in existing:
+                released_counts[file.name] += 1
+            else:
+                unreferenced.setdefault(file.name, file)
+        # One UPDATE for all objects released the same number of times
+        names_by_count: defaultdict[int, list[str]] = defaultdict(list)
+        for name, count in released_counts.items():
+            names_by_count[count].append(name)
+        for count, names in names_by_count.items():
+            await session.execute(
+                update(StorageObject)
+                .where(col(StorageObject.name).in_(names))
+                .values(ref_count=StorageObject.ref_count - count)
+            )
+        released_query = (
+            select(col(StorageObject.name), col(StorageObject.has_variants))
+            .where(col(StorageObject.name).in_(existing.keys()))
+            .where(col(StorageObject.ref_count) <= 0)
+        )
+        for name, has_variants in await session.execute(released_query):
+            unreferenced[name] = StoredFile(name, has_variants)
+        await session.execute(
+            delete(StorageObject)
+            .where(col(StorageObject.name).in_(existing.keys()))
+            .where(col(StorageObject.ref_count) <= 0)
+        )
+        return list(unreferenced.values())
+
+    async def schedule_removal(
+        self, session: AsyncSession, files: Iterable[StoredFile]
+    ) -> None:
+        """Добавление задачи удаления объектов files из хранилища. Задача
+        выполняется после фиксации транзакции"""
+        images = [[file.name, file.has_variants] for file in files]
+        if len(images) > 0:
+            await job_queue.enqueue(
+                session, REMOVE_STORAGE_OBJECTS_JOB, {"images": images}
+            )
+
+    async def referenced_names(
+        self, session: AsyncSession, names: Iterable[str]
+    ) -> set[str]:
+        """Имена из names, на которые сейчас ссылаются счётчики ссылок или
+        изображения трасс. Такие объекты нельзя удалять, даже если удаление
+        было запланировано раньше: объект с тем же содержимым мог быть
+        загружен снова"""
+        names = list(names)
+        referenced = set(
+            (
+                await session.scalars(
+                    select(col(StorageObject.name))
+                    .where(col(StorageObject.name).in_(names))
+                    .where(col(StorageObject.ref_count) > 0)
+                )
+            ).all()
+        )
+        referenced.update(
+            (
+                await session.scalars(
+                    select(col(RouteImage.url)).where(col(RouteImage.url).in_(names))
+                )
+            ).all()
+        )
+        return referenced
+
+    async def linked_names(self, session: AsyncSession) -> set[str]:
+        """Имена всех используемых объектов вместе с их уменьшенными копиями"""
+        names: set[str] = set()
+        for name, has_variants in await session.execute(
+            select(col(StorageObject.name), col(StorageObject.has_variants)).where(
+                col(StorageObject.ref_count) > 0
+            )
+        ):
+            names.add(name)
+            if has_variants:
+                names.update(variant_name(name, variant) for variant in IMAGE_VARIANTS)
+        return names
+
+
+storage_object = CRUDStorageObject(StorageObject)
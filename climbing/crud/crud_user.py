@@ -0,0 +1,123 @@
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col
+
+from climbing.api.deps import StoredFile
+from climbing.crud.base import CRUDBase
+from climbing.crud.crud_storage_object import storage_object as crud_storage_object
+from climbing.db.models.ascent import Ascent
+from climbing.db.models.competition import Competition
+from climbing.db.models.competition_participant import CompetitionParticipant
+from climbing.db.models.latest_ascent import LatestAscent
+from climbing.db.models.route import Route
+from climbing.db.models.route_image import RouteImage
+from climbing.db.models.user import User, UserCreate, UserUpdate
+
+
+class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
+    """CRUD class for set-based operations on users' data. Users themselves
+    are managed by UserManager. Methods don't commit changes, so they can be a
+    part of a larger transaction"""
+
+    async def merge(self, session: AsyncSession, user: User, replacement: User) -> None:
+        """Передача всех участий, пролазов, трасс и соревнований пользователя
+        user пользователю replacement несколькими UPDATE-запросами. Если оба
+        пользователя участвовали в одном соревновании, сохраняется участие
+        replacement. Пользователь user после этого не удаляется"""
+        replacement_competitions = select(
+            col(CompetitionParticipant.competition_id)
+        ).where(col(CompetitionParticipant.user_id) == replacement.id)
+        await session.execute(
+            delete(CompetitionParticipant)
+            .where(col(CompetitionParticipant.user_id) == user.id)
+            .where(
+                col(CompetitionParticipant.competition_id).in_(replacement_competitions)
+            )
+        )
+        await session.execute(
+            update(CompetitionParticipant)
+            .where(col(CompetitionParticipant.user_id) == user.id)
+            .values(user_id=replacement.id)
+        )
+        await session.execute(
+            update(Ascent)
+            .where(col(Ascent.user_id) == user.id)
+            .values(user_id=replacement.id)
+        )
+        await session.execute(
+            update(Route)
+            .where(col(Route.author_id) == user.id)
+            .values(author_id=replacement.id)
+        )
+        await session.execute(
+            update(Competition)
+            .where(col(Competition.organizer_id) == user.id)
+            .values(organizer_id=replacement.id)
+        )
+        await self._rebuild_latest_ascents(session, user, replacement)
+        # Loaded collections would still contain moved rows and deleting user
+        # would cascade to them
+        session.expire(user, ["ascents", "routes"])
+
+    async def delete_content(self, session: AsyncSession, user: User) -> None:
+        """Удаление трасс, изображений трасс и пролазов пользователя
+        несколькими DELETE-запросами. Пролазы других пользователей на
+        удаляемые трассы удаляются каскадно. Объекты хранилища, на которые
+        больше не осталось ссылок, удаляются фоновой задачей после фиксации
+        транзакции. Пользователь user после этого не удаляется"""
+        user_routes = select(col(Route.id)).where(col(Route.author_id) == user.id)
+        images = [
+            StoredFile(url, has_variants)
+            for url, has_variants in await session.execute(
+                select(col(RouteImage.url), col(RouteImage.has_variants)).where(
+                    col(RouteImage.route_id).in_(user_routes)
+                )
+            )
+        ]
+        await session.execute(
+            delete(RouteImage).where(col(RouteImage.route_id).in_(user_routes))
+        )
+        unreferenced = await crud_storage_object.release(session, images)
+        await crud_storage_object.schedule_removal(session, unreferenced)
+        await session.execute(delete(Route).where(col(Route.author_id) == user.id))
+        await session.execute(delete(Ascent).where(col(Ascent.user_id) == user.id))
+        # Otherwise deleting user would load collections and delete or update
+        # their rows one by one
+        session.expire(user, ["ascents", "routes"])
+
+    async def _rebuild_latest_ascents(
+        self, session: AsyncSession, user: User, replacement: User
+    ) -> None:
+        await session.execute(
+            delete(LatestAscent).where(
+                col(LatestAscent.user_id).in_([user.id, replacement.id])
+            )
+        )
+        ranked_ascents = (
+            select(
+                col(Ascent.user_id),
+                col(Ascent.route_id),
+                col(Ascent.id).label("ascent_id"),
+                func.row_number()
+                .over(
+                    partition_by=col(Ascent.route_id),
+                    order_by=col(Ascent.date).desc(),
+                )
+                .label("ascent_priority"),
+            )
+            .where(col(Ascent.user_id) == replacement.id)
+            .subquery()
+        )
+        await session.execute(
+            insert(LatestAscent).from_select(
+                ["user_id", "route_id", "ascent_id"],
+                select(
+                    ranked_ascents.c.user_id,
+                    ranked_ascents.c.route_id,
+                    ranked_ascents.c.ascent_id,
+                ).where(ranked_ascents.c.ascent_priority == 1),
+            )
+        )
+
+
+user = CRUDUser(User)
@@ -0,0 +1,102 @@
+from hashlib import sha1
+from itertools import chain
+from typing import Hashable, Iterable
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlmodel import col
+
+from climbing.db.models.data_version import DataVersion
+from climbing.db.models.job import Job
+from climbing.db.session import upsert
+
+# Key of Session.info with names of tables changed in current transaction
+CHANGED_TABLES_KEY = "changed_tables"
+# Job queue changes on every claim and isn't served to clients
+UNVERSIONED_TABLES = {DataVersion.__tablename__, Job.__tablename__}
+
+
+class DataVersions:
+    """Counters of committed changes per table stored in dataversion table.
+    Counters are increased in the same transaction as changes, so ETags
+    computed from them are the same in all processes"""
+
+    def bump(self, session: Session, tables: Iterable[str]) -> None:
+        """Increments counters of tables within current transaction"""
+        # Rows are locked in the same order by all transactions
+        names = sorted(set(tables) - UNVERSIONED_TABLES)
+        if not names:
+            return
+        session.execute(
+            upsert(session, DataVersion)
+            .values([{"table_name": name, "version": 1} for name in names])
+            .on_conflict_do_update(
+                index_elements=[col(DataVersion.table_name)],
+                set_={"version": col(DataVersion.version) + 1},
+            )
+        )
+
+    async def versions(
+        self, session: AsyncSession, tables: Iterable[str]
+    ) -> dict[str, int]:
+        """Returns current counters of tables. Tables which were never changed
+        have counter 0"""
+        names = set(tables)
+        rows = await session.execute(
+            select(col(DataVersion.table_name), col(DataVersion.version)).where(
+                col(DataVersion.table_name).in_(names)
+            )
+        )
+        return {name: 0 for name in names} | dict(rows.tuples().all())
+
+    @staticmethod
+    def key(versions: dict[str, int]) -> str:
+        """Returns short string which identifies counters of tables"""
+        return sha1(repr(sorted(versions.items())).encode()).hexdigest()
+
+    def etag(self, versions: dict[str, int], *extra: Hashable) -> str:
+        """Returns strong ETag which changes when any of versions is changed.
+        extra values (query parameters, current date and so on) are included
+        into ETag too"""
+        state = (self.key(versions), extra)
+        return f'"{sha1(repr(state).encode()).hexdigest()}"'
+
+
+data_versions = DataVersions()
+
+
+def _changed_tables(session: Session) -> set[str]:
+    return session.info.setdefault(CHANGED_TABLES_KEY, set())
+
+
+@event.listens_for(Session, "after_flush")
+def collect_flushed_tables(session: Session, _) -> None:
+    tables = _changed_tables(session)
+    for obj in chain(session.new, session.dirty, session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table is not None:
+            tables.add(table)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def collect_statement_tables(orm_execute_state: ORMExecuteState) -> None:
+    state = orm_execute_state
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement.table, "name", None)  # type: ignore
+        if table is not None:
+            _changed_tables(state.session).add(table)
+
+
+@event.listens_for(Session, "before_commit")
+def bump_changed_tables(session: Session) -> None:
+    # Commit flushes pending objects after this event, so they are flushed
+    # here to be counted in the same transaction
+    session.flush()
+    data_versions.bump(session, session.info.pop(CHANGED_TABLES_KEY, ()))
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def forget_changed_tables(session: Session) -> None:
+    session.info.pop(CHANGED_TABLES_KEY, None)
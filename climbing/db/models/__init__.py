@@ -4,6 +4,11 @@ from .ascent import Ascent, AscentBase, AscentCreate, AscentUpdate
 from .category import Category
 from .competition import Competition
 from .competition_participant import CompetitionParticipant
+from .data_version import DataVersion
+from .job import Job, JobStatus
+from .latest_ascent import LatestAscent
+from .rating_snapshot import RatingSnapshot, RatingSnapshotHeader
+from .storage_object import StorageObject
 from .route import Route, RouteBase, RouteBaseDB, RouteCreate, RouteUpdate
 from .route_image import RouteImage
 from .user import (
@@ -24,6 +29,13 @@ __all__ = [
     "Category",
     "Competition",
     "CompetitionParticipant",
+    "DataVersion",
+    "Job",
+    "JobStatus",
+    "LatestAscent",
+    "RatingSnapshot",
+    "RatingSnapshotHeader",
+    "StorageObject",
     "Route",
     "RouteBase",
     "RouteBaseDB",
@@ -2,9 +2,8 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 from uuid import uuid4
 
-from fastapi import Request
 from pydantic import UUID4
-from sqlalchemy import Column, ForeignKey
+from sqlalchemy import Column, ForeignKey, Index
 from sqlmodel import Field, Relationship, SQLModel
 
 from .route import Route
@@ -37,6 +36,12 @@ class AscentUpdate(AscentBase):
 class Ascent(AscentBase, table=True):
     """Ascent model"""
 
+    __table_args__ = (
+        Index("ix_ascent_date_user_id_route_id", "date", "user_id", "route_id"),
+        # Latest ascent of user on route
+        Index("ix_ascent_user_id_route_id_date", "user_id", "route_id", "date"),
+    )
+
     id: UUID4 = Field(default_factory=uuid4, primary_key=True)
     route_id: UUID4 = Field(
         sa_column=Column(
@@ -53,9 +58,3 @@ class Ascent(AscentBase, table=True):
         ),
     )
     user: "User" = Relationship(back_populates="ascents")
-
-    def set_absolute_image_urls(self, request: Request) -> None:
-        """Устанавливает абсолютные, а не относительные URL-адреса для
-        изображений"""
-        # pylint: disable=no-member
-        self.route.set_absolute_image_urls(request)
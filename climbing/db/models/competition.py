@@ -4,6 +4,7 @@ from typing import List
 from uuid import uuid4
 
 from pydantic import UUID4
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 from climbing.db.models.competition_participant import (
@@ -43,6 +44,8 @@ class CompetitionUpdate(CompetitionBase):
 class Competition(CompetitionBase, table=True):
     """Таблица для хранения соревнований"""
 
+    __table_args__ = (Index("ix_competition_date", "date"),)
+
     id: UUID4 = Field(title="ID соревнования", primary_key=True, default_factory=uuid4)
     organizer_id: UUID4 = Field(
         ..., title="ID организатора соревнования", foreign_key="user.id"
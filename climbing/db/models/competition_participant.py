@@ -2,7 +2,7 @@ from typing import TYPE_CHECKING
 from uuid import uuid4
 
 from pydantic import UUID4
-from sqlalchemy import Column, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, ForeignKey, Index, UniqueConstraint
 from sqlmodel import Field, Relationship, SQLModel
 
 from climbing.db.models.user import User
@@ -47,6 +47,11 @@ class CompetitionParticipant(CompetitionParticipantCreate, table=True):
             "user_id",
             name="competitionparticipant_unique_constraint",
         ),
+        Index(
+            "ix_competitionparticipant_competition_id_place",
+            "competition_id",
+            "place",
+        ),
     )
 
     id: UUID4 = Field(
@@ -0,0 +1,11 @@
+from sqlmodel import Field, SQLModel
+
+
+class DataVersion(SQLModel, table=True):
+    """Таблица со счётчиками изменений таблиц. Счётчик увеличивается в той же
+    транзакции, что и изменение, поэтому одинаков для всех процессов"""
+
+    table_name: str = Field(
+        ..., max_length=100, primary_key=True, title="Имя изменённой таблицы"
+    )
+    version: int = Field(default=0, title="Количество изменений таблицы")
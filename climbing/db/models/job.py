@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+from typing import Any
+from uuid import uuid4
+
+from pydantic import UUID4
+from sqlalchemy import JSON, Column, DateTime, Index, Text
+from sqlmodel import AutoString, Field, SQLModel
+
+from climbing.util import ExtendedEnum
+
+
+class JobStatus(str, ExtendedEnum):
+    """Состояния фоновой задачи"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+
+
+class Job(SQLModel, table=True):
+    """Таблица очереди фоновых задач. Выполненные задачи удаляются, задачи,
+    исчерпавшие попытки, остаются со статусом failed"""
+
+    __table_args__ = (Index("ix_job_status_run_after", "status", "run_after"),)
+
+    id: UUID4 = Field(default_factory=uuid4, primary_key=True)
+    kind: str = Field(..., max_length=100, title="Тип задачи")
+    payload: dict[str, Any] = Field(
+        default_factory=dict, sa_column=Column(JSON, nullable=False)
+    )
+    status: JobStatus = Field(
+        default=JobStatus.PENDING, sa_type=AutoString, title="Состояние задачи"
+    )
+    attempts: int = Field(default=0, title="Количество начатых попыток")
+    run_after: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+    locked_until: datetime | None = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
+    last_error: str | None = Field(default=None, sa_type=Text)
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
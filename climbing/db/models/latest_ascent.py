@@ -0,0 +1,29 @@
+from pydantic import UUID4
+from sqlalchemy import Column, ForeignKey
+from sqlmodel import Field, SQLModel
+
+
+class LatestAscent(SQLModel, table=True):
+    """Таблица, хранящая последний по дате подъём каждого пользователя на
+    каждую трассу. Поддерживается в актуальном состоянии при изменении
+    подъёмов"""
+
+    user_id: UUID4 = Field(
+        sa_column=Column(
+            ForeignKey("user.id", ondelete="CASCADE", name="latestascent_user_fk"),
+            primary_key=True,
+        ),
+    )
+    route_id: UUID4 = Field(
+        sa_column=Column(
+            ForeignKey("route.id", ondelete="CASCADE", name="latestascent_route_fk"),
+            primary_key=True,
+        ),
+    )
+    ascent_id: UUID4 = Field(
+        sa_column=Column(
+            ForeignKey("ascent.id", ondelete="CASCADE", name="latestascent_ascent_fk"),
+            nullable=False,
+            unique=True,
+        ),
+    )
@@ -0,0 +1,56 @@
+from datetime import date as dateclass
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from pydantic import UUID4
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Text
+from sqlmodel import Field, SQLModel
+
+
+class RatingSnapshot(SQLModel, table=True):
+    """Таблица для хранения предрассчитанного рейтинга. Каждая строка —
+    сериализованная модель Score одного пользователя для рейтинга на конец дня
+    day с фильтром filter_key"""
+
+    __table_args__ = (
+        Index(
+            "ix_ratingsnapshot_day_filter_key_place",
+            "day",
+            "filter_key",
+            "place",
+        ),
+    )
+
+    id: UUID4 = Field(default_factory=uuid4, primary_key=True)
+    day: dateclass = Field(..., title="День, на конец которого рассчитан рейтинг")
+    filter_key: str = Field(..., max_length=50, title="Ключ фильтра рейтинга")
+    user_id: UUID4 = Field(
+        sa_column=Column(
+            ForeignKey("user.id", ondelete="CASCADE", name="ratingsnapshot_user_fk"),
+            nullable=False,
+        ),
+    )
+    place: int = Field(..., title="Место в рейтинге")
+    data: str = Field(..., sa_type=Text, title="Сериализованная модель Score")
+
+
+class RatingSnapshotHeader(SQLModel, table=True):
+    """Таблица с отметками о сохранённых рейтингах. Отметка сохраняется и для
+    пустого рейтинга, у которого нет строк RatingSnapshot, поэтому пустой
+    рейтинг отличается от ещё не рассчитанного. Отметка хранит ключ версий
+    данных (см. DataVersions.key), по которым рассчитан рейтинг, и рейтинг
+    используется только пока версии не изменились"""
+
+    day: dateclass = Field(
+        ..., primary_key=True, title="День, на конец которого рассчитан рейтинг"
+    )
+    filter_key: str = Field(
+        ..., max_length=50, primary_key=True, title="Ключ фильтра рейтинга"
+    )
+    data_version: str = Field(
+        ..., max_length=40, title="Ключ версий данных, по которым рассчитан рейтинг"
+    )
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
@@ -3,7 +3,7 @@ from datetime import date, datetime, timezone
 from typing import List
 from uuid import uuid4
 
-from fastapi import Request, UploadFile
+from fastapi import UploadFile
 from pydantic import UUID4, model_validator, validator
 from sqlmodel import AutoString, Field, Relationship, SQLModel
 
@@ -71,6 +71,11 @@ class RouteUpdate(RouteCreate):
     """Модель для обновления трассы. Должна создаваться вручную (не может быть
     использована напрямую как параметр запроса)."""
 
+    kept_image_ids: list[UUID4] = Field(
+        default_factory=list,
+        description="ID уже загруженных изображений, которые нужно оставить",
+    )
+
 
 class Route(RouteBaseDB, table=True):
     """Модель для хранения информации о трассе."""
@@ -83,10 +88,3 @@ class Route(RouteBaseDB, table=True):
         nullable=False,
         title="Дата добавления трассы на сервер",
     )
-
-    def set_absolute_image_urls(self, request: Request) -> None:
-        """Устанавливает абсолютные, а не относительные URL-адреса для
-        изображений"""
-
-        for image in self.images:  # pylint: disable=not-an-iterable
-            image.set_absolute_url(request)
@@ -2,11 +2,10 @@ from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 from uuid import uuid4
 
-from fastapi import Request
 from pydantic import UUID4
 from sqlmodel import Field, Relationship, SQLModel
 
-from climbing.core.config import settings
+from climbing.core.images import variant_name
 
 if TYPE_CHECKING:
     from .route import Route
@@ -17,14 +16,6 @@ class BaseRouteImage(SQLModel):
 
     url: str
 
-    def set_absolute_url(self, request: Request):
-        """Устанавливает абсолютный, а не относительный URL-адрес для
-        изображения"""
-        if "://" in self.url:
-            return
-        url_obj = request.url
-        self.url = f"{url_obj.scheme}://{settings.MINIO_HOST}/{settings.MINIO_BUCKET_NAME}/{self.url}"
-
 
 class RouteImage(BaseRouteImage, table=True):
     """Полная таблица для хранения изображений трасс"""
@@ -34,3 +25,23 @@ class RouteImage(BaseRouteImage, table=True):
     route_id: UUID4 = Field(foreign_key="route.id")
     route: "Route" = Relationship(back_populates="images")
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    has_variants: bool = Field(
+        default=False,
+        title="Сохранены ли уменьшенные копии изображения",
+        sa_column_kwargs={"server_default": "0"},
+    )
+    content_hash: str | None = Field(
+        default=None,
+        max_length=64,
+        title="SHA-256 хэш содержимого изображения",
+    )
+
+    @property
+    def thumbnail_url(self) -> str | None:
+        """URL-адрес миниатюры изображения"""
+        return variant_name(self.url, "thumbnail") if self.has_variants else None
+
+    @property
+    def medium_url(self) -> str | None:
+        """URL-адрес изображения среднего размера"""
+        return variant_name(self.url, "medium") if self.has_variants else None
@@ -0,0 +1,15 @@
+from sqlmodel import Field, SQLModel
+
+
+class StorageObject(SQLModel, table=True):
+    """Таблица со счётчиками ссылок на объекты хранилища. Изображения хранятся
+    под именами, полученными из хэша их содержимого, поэтому один объект может
+    использоваться несколькими изображениями трасс"""
+
+    name: str = Field(..., max_length=300, primary_key=True, title="Имя объекта")
+    ref_count: int = Field(default=0, title="Количество ссылок на объект")
+    has_variants: bool = Field(
+        default=False,
+        title="Сохранены ли уменьшенные копии изображения",
+        sa_column_kwargs={"server_default": "0"},
+    )
@@ -2,7 +2,6 @@ from datetime import datetime, timezone
 from enum import Enum
 from typing import TYPE_CHECKING, List
 
-from fastapi import Request
 from fastapi_users.schemas import BaseUserCreate, BaseUserUpdate
 from fastapi_users_db_sqlmodel import (
     SQLModelBaseOAuthAccount,
@@ -120,13 +119,6 @@ class User(UserBaseWithCreatedAt, SQLModelBaseUserDB, table=True):
     oauth_accounts: List[OAuthAccount] = Relationship()
     routes: List["Route"] = Relationship(back_populates="author")
 
-    def set_absolute_image_urls(self, request: Request) -> None:
-        """Устанавливает абсолютные, а не относительные URL-адреса для
-        изображений трасс"""
-
-        for route in self.routes:  # pylint: disable=not-an-iterable
-            route.set_absolute_image_urls(request)
-
     def __hash__(self):
         return hash(
             (
@@ -1,32 +1,89 @@
-from sqlite3 import Connection as SQLite3Connection
-from typing import Annotated, AsyncGenerator
+from typing import Annotated, Any, AsyncGenerator
 
 from fastapi import Depends
 from fastapi_users_db_sqlmodel.access_token import (
     SQLModelAccessRefreshTokenDatabaseAsync,
 )
-from sqlalchemy import event
-from sqlalchemy.engine import Engine
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import event, make_url
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 
 from climbing.core.config import settings
 from climbing.db.models.user import AccessRefreshToken, OAuthAccount, User
 from climbing.db.user_database import UserDatabase
 
 
-@event.listens_for(Engine, "connect")
-def set_sqlite_pragma(dbapi_connection, _):
-    if (
-        isinstance(dbapi_connection, SQLite3Connection)
-        or "sqlite" in settings.SQLALCHEMY_DATABASE_URI  # type: ignore
-    ):
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON;")
-        cursor.close()
+def set_sqlite_pragmas(dbapi_connection, _) -> None:
+    """Configures every new SQLite connection. WAL journal lets readers work
+    concurrently with the writer"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}")
+    cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+    cursor.execute(
+        "PRAGMA busy_timeout="
+        f"{int(settings.SQLITE_BUSY_TIMEOUT.total_seconds() * 1000)}"
+    )
+    cursor.close()
+
+
+def set_sqlite_query_only(dbapi_connection, _) -> None:
+    """Forbids writes through connection"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+def is_in_memory_sqlite(database_uri: str) -> bool:
+    """Checks if URI points to in-memory SQLite database, which exists only
+    within single connection"""
+    url = make_url(database_uri)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
 
 
-engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI)  # type: ignore
+def upsert(session: Session | AsyncSession, model: Any) -> Any:
+    """Returns INSERT of dialect which session is bound to. Unlike generic
+    INSERT it supports ON CONFLICT clause (on_conflict_do_update and
+    on_conflict_do_nothing methods)"""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model)
+    if dialect == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"INSERT ... ON CONFLICT isn't supported by {dialect}")
+
+
+def create_engine(database_uri: str, read_only: bool = False) -> AsyncEngine:
+    """Creates async engine with pool settings from Settings. SQLite pragmas
+    are set only for SQLite databases. Connections of read-only engine reject
+    writes"""
+    url = make_url(database_uri)
+    is_sqlite = url.get_backend_name() == "sqlite"
+    options: dict[str, Any] = {
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+        "pool_recycle": int(settings.DATABASE_POOL_RECYCLE.total_seconds()),
+    }
+    # In-memory SQLite database uses static pool of one connection
+    if not is_in_memory_sqlite(database_uri):
+        options.update(
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT.total_seconds(),
+        )
+    if read_only and url.get_backend_name() == "postgresql":
+        options["execution_options"] = {"postgresql_readonly": True}
+    new_engine = create_async_engine(url, **options)
+    if is_sqlite:
+        event.listen(new_engine.sync_engine, "connect", set_sqlite_pragmas)
+        if read_only:
+            event.listen(new_engine.sync_engine, "connect", set_sqlite_query_only)
+    return new_engine
+
+
+engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)  # type: ignore
 async_session_maker = sessionmaker[AsyncSession](  # type: ignore
     bind=engine,  # type: ignore
     class_=AsyncSession,
@@ -34,6 +91,22 @@ async_session_maker = sessionmaker[AsyncSession](  # type: ignore
     expire_on_commit=False,
     autocommit=False,
 )
+if settings.SQLALCHEMY_READ_DATABASE_URI is not None:
+    read_engine = create_engine(settings.SQLALCHEMY_READ_DATABASE_URI, read_only=True)
+elif is_in_memory_sqlite(settings.SQLALCHEMY_DATABASE_URI):  # type: ignore
+    # Separate pool would open another empty database
+    read_engine = engine
+else:
+    read_engine = create_engine(
+        settings.SQLALCHEMY_DATABASE_URI, read_only=True  # type: ignore
+    )
+async_read_session_maker = sessionmaker[AsyncSession](  # type: ignore
+    bind=read_engine,  # type: ignore
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+    autocommit=False,
+)
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
@@ -42,7 +115,16 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+async def get_async_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Session bound to read replica or to separate read-only pool of primary
+    database. Must be used only by handlers which don't write"""
+    session: AsyncSession
+    async with async_read_session_maker() as session:
+        yield session
+
+
 AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
+AsyncReadSessionDep = Annotated[AsyncSession, Depends(get_async_read_session)]
 
 
 async def get_user_db(
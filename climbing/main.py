@@ -1,11 +1,37 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_versionizer import Versionizer
 
 from climbing.api.api_v1 import api_router as api_v1_router
 from climbing.api.api_v2 import api_router as api_v2_router
+from climbing.core.config import settings
+from climbing.core.storage import get_storage_backend
+from climbing.util.job_workers import start_workers, stop_workers
+from climbing.util.storage_gc import run_periodically
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    await run_in_threadpool(get_storage_backend().prepare)
+    gc_task: asyncio.Task | None = None
+    if settings.STORAGE_GC_INTERVAL is not None:
+        gc_task = asyncio.create_task(run_periodically(settings.STORAGE_GC_INTERVAL))
+    # Job handlers are registered by modules imported with routers
+    job_workers = start_workers(settings.JOB_WORKERS)
+    yield
+    await stop_workers(job_workers)
+    if gc_task is not None:
+        gc_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await gc_task
+
 
 app = FastAPI(
+    lifespan=lifespan,
     contact={"Автор": "Александр Макурин ae_mc@mail.ru|alexandr.mc12@gmail.com"},
     version="v1",
 )
@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+MAX_PAGE_SIZE = 500
+
+
+class Pagination(BaseModel):
+    limit: int | None = Field(None, ge=1, le=MAX_PAGE_SIZE)
+    cursor: str | None = Field(None)
@@ -6,3 +6,9 @@ from climbing.db.models.user import SexEnum
 class RatingFilter(BaseModel):
     is_student: bool | None = Field(None)
     sex: SexEnum | None = Field(None)
+
+    @property
+    def key(self) -> str:
+        """Строковый ключ фильтра, используемый для хранения рассчитанных
+        рейтингов"""
+        return f"{self.is_student}:{self.sex}"
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class TableFormat(Enum):
+    XLSX = "xlsx"
+    CSV = "csv"
+    TSV = "tsv"
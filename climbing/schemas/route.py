@@ -1,12 +1,31 @@
+from datetime import datetime
 from typing import List
 
-from pydantic import Field
+from pydantic import UUID4, Field, field_serializer
 
-from climbing.db.models import RouteImage
+from climbing.core.storage import absolute_media_url
+from climbing.db.models.route_image import BaseRouteImage
 
 from .base_read_classes import RouteRead, UserRead
 
 
+class RouteImageRead(BaseRouteImage):
+    """Модель для чтения изображения трассы со ссылками на уменьшенные
+    копии"""
+
+    id: UUID4
+    route_id: UUID4
+    created_at: datetime
+    thumbnail_url: str | None = Field(None, title="Миниатюра изображения")
+    medium_url: str | None = Field(None, title="Изображение среднего размера")
+
+    @field_serializer("url", "thumbnail_url", "medium_url")
+    def serialize_url(self, url: str | None) -> str | None:
+        """В базе хранятся имена объектов, абсолютные URL-адреса формируются
+        только при сериализации ответа"""
+        return None if url is None else absolute_media_url(url)
+
+
 class RouteReadWithAuthor(RouteRead):
     """Модель для чтения трассы с полем uploader"""
 
@@ -16,9 +35,7 @@ class RouteReadWithAuthor(RouteRead):
 class RouteReadWithImages(RouteRead):
     """Модель для чтения трассы с полем images"""
 
-    images: List[RouteImage] = Field(
-        default=[], title="Список изображений трассы"
-    )
+    images: List[RouteImageRead] = Field(default=[], title="Список изображений трассы")
 
 
 class RouteReadWithAll(RouteReadWithAuthor, RouteReadWithImages):
@@ -1,12 +1,13 @@
 from typing import List
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import UUID4, BaseModel, ConfigDict, Field
 
 from climbing.schemas.ascent import AscentReadWithRoute
-from climbing.schemas.base_read_classes import UserRead
+from climbing.schemas.base_read_classes import AscentRead, CompetitionRead, UserRead
 from climbing.schemas.competition_participant import (
     CompetitionParticipantReadRating,
 )
+from climbing.schemas.route import RouteReadWithImages
 
 
 class Score(BaseModel):
@@ -29,3 +30,100 @@ class Score(BaseModel):
     )
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class AscentReadWithRouteId(AscentRead):
+    """Пролаз со ссылкой на трассу из словаря routes"""
+
+    route_id: UUID4 = Field(..., title="ID трассы")
+
+
+class ParticipationReadRating(BaseModel):
+    """Участие в соревновании со ссылкой на соревнование из словаря
+    competitions"""
+
+    id: UUID4 = Field(..., title="ID записи")
+    competition_id: UUID4 = Field(..., title="ID соревнования")
+    place: int = Field(..., title="Место, занятое участником в соревновании")
+    score: float = Field(0, title="Полученные за соревнование баллы рейтинга")
+
+
+class NormalizedScore(BaseModel):
+    """Строка рейтинга, ссылающаяся на пользователей, трассы и соревнования
+    по ID"""
+
+    user_id: UUID4 = Field(..., title="ID пользователя")
+    place: int = Field(..., title="Место в рейтинге")
+    score: float = Field(default=0, title="Количество очков")
+    ascents_score: float = Field(default=0, title="Количество очков за трассы")
+    participations: List[ParticipationReadRating] = Field(
+        default_factory=lambda: list(), title="Участия в соревнованиях"
+    )
+    ascents: List[AscentReadWithRouteId] = Field(
+        default_factory=lambda: list(), title="Список пролазов"
+    )
+
+
+class NormalizedRating(BaseModel):
+    """Рейтинг, в котором каждый пользователь, трасса и соревнование
+    передаются один раз"""
+
+    scores: List[NormalizedScore] = Field(..., title="Строки рейтинга")
+    users: dict[UUID4, UserRead] = Field(..., title="Участники рейтинга и авторы трасс")
+    routes: dict[UUID4, RouteReadWithImages] = Field(..., title="Пройденные трассы")
+    competitions: dict[UUID4, CompetitionRead] = Field(
+        ..., title="Соревнования, учтённые в рейтинге"
+    )
+
+    @classmethod
+    def from_scores(cls, scores: List[Score]) -> "NormalizedRating":
+        """Builds normalized rating from scores. Each distinct route, user and
+        competition is converted once"""
+        users: dict[UUID4, UserRead] = {}
+        routes: dict[UUID4, RouteReadWithImages] = {}
+        competitions: dict[UUID4, CompetitionRead] = {}
+        normalized_scores: list[NormalizedScore] = []
+        for score in scores:
+            users[score.user.id] = score.user
+            for participation in score.participations:
+                competitions.setdefault(
+                    participation.competition.id, participation.competition
+                )
+            for ascent in score.ascents:
+                if ascent.route.id not in routes:
+                    routes[ascent.route.id] = RouteReadWithImages.model_validate(
+                        ascent.route, from_attributes=True
+                    )
+                    users.setdefault(ascent.route.author.id, ascent.route.author)
+            normalized_scores.append(
+                NormalizedScore(
+                    user_id=score.user.id,
+                    place=score.place,
+                    score=score.score,
+                    ascents_score=score.ascents_score,
+                    participations=[
+                        ParticipationReadRating(
+                            id=participation.id,
+                            competition_id=participation.competition.id,
+                            place=participation.place,
+                            score=participation.score,
+                        )
+                        for participation in score.participations
+                    ],
+                    ascents=[
+                        AscentReadWithRouteId(
+                            id=ascent.id,
+                            is_flash=ascent.is_flash,
+                            date=ascent.date,
+                            route_id=ascent.route.id,
+                        )
+                        for ascent in score.ascents
+                    ],
+                )
+            )
+        return cls(
+            scores=normalized_scores,
+            users=users,
+            routes=routes,
+            competitions=competitions,
+        )
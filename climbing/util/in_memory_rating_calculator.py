@@ -0,0 +1,87 @@
+import heapq
+
+from pydantic import UUID4
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col
+
+from climbing.core.config import settings
+from climbing.db.models.ascent import Ascent
+from climbing.db.models.route import Route
+from climbing.db.models.user import User
+from climbing.schemas.filters.rating_filter import RatingFilter
+from climbing.util.rating_calculator import RatingCalculator
+
+
+class InMemoryRatingCalculator(RatingCalculator):
+    """Users rating calculator which computes routes competition in Python
+    instead of using SQL window functions"""
+
+    async def calc_routes_competition(self) -> None:
+        period_ascents = (
+            select(Ascent)
+            .where(col(Ascent.date) >= self._start_date)
+            .where(col(Ascent.date) <= self._end_date)
+        )
+        query = period_ascents.with_only_columns(
+            col(Ascent.user_id),
+            col(Ascent.route_id),
+            self.categories_case.label("route_cost"),
+        ).join(Route)
+        if self._filter_params is not None:
+            query = self._filtered_query(
+                query.join(User, onclause=col(Ascent.user_id) == col(User.id))
+            )
+
+        user_routes: dict[UUID4, dict[UUID4, float]] = {}
+        for user_id, route_id, route_cost in await self.session.execute(query):
+            user_routes.setdefault(user_id, {})[route_id] = route_cost
+
+        users_scores: dict[UUID4, float] = {
+            user_id: sum(
+                heapq.nlargest(self.COUNT_OF_ROUTES_TAKEN_IN_ACCOUNT, routes.values())
+            )
+            for user_id, routes in user_routes.items()
+        }
+        # Users are selected by the same ascents filter instead of list of
+        # their ids, which may exceed limit of query parameters
+        users = (
+            (
+                await self.session.execute(
+                    self._filtered_query(
+                        select(User).where(
+                            col(User.id).in_(
+                                period_ascents.with_only_columns(col(Ascent.user_id))
+                            )
+                        )
+                    )
+                )
+            )
+            .scalars()
+            .all()
+        )
+
+        self.routes_competition_table = {}
+        self.user_routes_ascent_table = {}
+        # Ascents added between the queries aren't counted
+        scored_users = [user for user in users if user.id in users_scores]
+        for user in sorted(
+            scored_users, key=lambda user: users_scores[user.id], reverse=True
+        ):
+            self.routes_competition_table.setdefault(users_scores[user.id], []).append(
+                user
+            )
+
+
+def create_rating_calculator(
+    session: AsyncSession, filter_params: RatingFilter | None = None
+) -> RatingCalculator:
+    """Returns rating calculator selected by RATING_ENGINE setting. With auto
+    SQL calculator is used only if session is bound to SQLite database"""
+    engine = settings.RATING_ENGINE
+    if engine == "auto":
+        is_sqlite = session.get_bind().dialect.name == "sqlite"
+        engine = "sql" if is_sqlite else "memory"
+    if engine == "memory":
+        return InMemoryRatingCalculator(session=session, filter_params=filter_params)
+    return RatingCalculator(session=session, filter_params=filter_params)
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+
+from climbing.core.config import settings
+from climbing.core.job_queue import job_queue
+from climbing.crud.crud_job import job as crud_job
+from climbing.db.models.job import Job
+from climbing.db.session import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+
+async def keep_lease(job: Job) -> None:
+    """Extends lock of running job until cancelled, so that job isn't
+    claimed by another worker while it runs longer than JOB_LEASE"""
+    while True:
+        await asyncio.sleep(settings.JOB_LEASE.total_seconds() / 3)
+        try:
+            async with async_session_maker() as session:
+                if not await crud_job.extend_lease(session, job, settings.JOB_LEASE):
+                    logger.warning("Job %s was claimed by another worker", job.id)
+                    return
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Failed to extend lock of job %s", job.id)
+
+
+async def run_job(job: Job) -> None:
+    """Executes claimed job. Attempt is limited by JOB_TIMEOUT. Failed job is
+    retried with exponential backoff until JOB_MAX_ATTEMPTS attempts are
+    made"""
+    handler = job_queue.get_handler(job.kind)
+    lease_keeper = asyncio.create_task(keep_lease(job))
+    try:
+        if handler is None:
+            raise LookupError(f"No handler of {job.kind} jobs")
+        await asyncio.wait_for(
+            handler(job.payload), settings.JOB_TIMEOUT.total_seconds()
+        )
+    except Exception as error:  # pylint: disable=broad-except
+        logger.exception("Job %s (%s) failed", job.id, job.kind)
+        async with async_session_maker() as session:
+            if handler is None or job.attempts >= settings.JOB_MAX_ATTEMPTS:
+                await crud_job.fail(
+                    session,
+                    job,
+                    repr(error),
+                    scrub=job_queue.scrubs_failed(job.kind),
+                )
+            else:
+                delay = settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+                await crud_job.retry(session, job, repr(error), delay)
+        return
+    finally:
+        lease_keeper.cancel()
+    async with async_session_maker() as session:
+        await crud_job.complete(session, job)
+
+
+async def run_worker() -> None:
+    """Executes jobs one by one until cancelled. Delayed jobs and jobs added
+    by other processes are found by polling every JOB_POLL_INTERVAL"""
+    while True:
+        try:
+            async with async_session_maker() as session:
+                job = await crud_job.claim(session, settings.JOB_LEASE)
+            if job is None:
+                await job_queue.wait(settings.JOB_POLL_INTERVAL)
+            else:
+                await run_job(job)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Job worker failed")
+            await asyncio.sleep(settings.JOB_POLL_INTERVAL.total_seconds())
+
+
+def start_workers(count: int) -> list[asyncio.Task]:
+    """Starts count workers in current event loop"""
+    return [
+        asyncio.create_task(run_worker(), name=f"job-worker-{i}") for i in range(count)
+    ]
+
+
+async def stop_workers(workers: list[asyncio.Task]) -> None:
+    """Cancels workers. Interrupted jobs are executed again after their lock
+    expires"""
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
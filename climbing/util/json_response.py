@@ -0,0 +1,40 @@
+from functools import cache
+from typing import Any, Mapping
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+
+@cache
+def _type_adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def encode_json(response_type: Any, content: Any, validate: bool = True) -> bytes:
+    """Serializes content as response_type straight to JSON bytes. Content
+    which already consists of response_type models can skip validation"""
+    adapter = _type_adapter(response_type)
+    if validate:
+        content = adapter.validate_python(content, from_attributes=True)
+    return adapter.dump_json(content)
+
+
+class PreEncodedJSONResponse(Response):
+    """JSON response with body encoded beforehand"""
+
+    media_type = "application/json"
+
+
+def json_response(
+    response_type: Any,
+    content: Any,
+    validate: bool = True,
+    headers: Mapping[str, str] | None = None,
+) -> PreEncodedJSONResponse:
+    """Returns response which bypasses response_model validation and
+    stdlib json encoding. response_model of endpoint is still used for
+    documentation. headers should contain headers set on injected Response,
+    because FastAPI doesn't merge them into returned response"""
+    return PreEncodedJSONResponse(
+        encode_json(response_type, content, validate), headers=headers
+    )
@@ -0,0 +1,86 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from typing import Any, Sequence
+from uuid import UUID
+
+from fastapi import Request, Response
+from sqlalchemy import and_, or_
+from sqlalchemy.sql.selectable import Select
+
+from climbing.core import responses
+from climbing.schemas.filters.pagination import Pagination
+
+
+def encode_cursor(value: datetime | None, row_id: UUID) -> str:
+    """Encodes position of row in keyset pagination into opaque string"""
+    data = json.dumps([value.isoformat() if value is not None else None, row_id.hex])
+    return urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, UUID]:
+    """Decodes cursor created by encode_cursor
+
+    Raises:
+        INVALID_CURSOR: if cursor is malformed
+    """
+    try:
+        value, row_id = json.loads(urlsafe_b64decode(cursor.encode()))
+        return (
+            datetime.fromisoformat(value) if value is not None else None,
+            UUID(hex=row_id),
+        )
+    except (ValueError, TypeError) as error:
+        raise responses.INVALID_CURSOR.exception() from error
+
+
+def paginate(
+    query: Select,
+    pagination: Pagination,
+    id_column: Any,
+    order_column: Any | None = None,
+    descending: bool = True,
+) -> Select:
+    """Applies keyset pagination over (order_column, id_column) to query"""
+    if order_column is None:
+        order_by = [id_column.desc() if descending else id_column.asc()]
+    else:
+        order_by = [
+            column.desc() if descending else column.asc()
+            for column in (order_column, id_column)
+        ]
+    query = query.order_by(*order_by)
+    if pagination.cursor is not None:
+        value, row_id = decode_cursor(pagination.cursor)
+        id_condition = id_column < row_id if descending else id_column > row_id
+        if order_column is None:
+            query = query.where(id_condition)
+        else:
+            query = query.where(
+                or_(
+                    order_column < value if descending else order_column > value,
+                    and_(order_column == value, id_condition),
+                )
+            )
+    if pagination.limit is not None:
+        query = query.limit(pagination.limit)
+    return query
+
+
+def set_next_page_link(
+    request: Request,
+    response: Response,
+    pagination: Pagination,
+    rows: Sequence[Any],
+    order_attribute: str | None = None,
+) -> None:
+    """Adds Link header with next page URL if page is full"""
+    if pagination.limit is None or len(rows) < pagination.limit:
+        return
+    last = rows[-1]
+    cursor = encode_cursor(
+        getattr(last, order_attribute) if order_attribute is not None else None,
+        last.id,
+    )
+    url = request.url.include_query_params(limit=pagination.limit, cursor=cursor)
+    response.headers["Link"] = f'<{url}>; rel="next"'
@@ -0,0 +1,101 @@
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Hashable
+
+from pydantic import BaseModel, Field
+
+from climbing.core.config import settings
+from climbing.core.job_queue import REFRESH_RATING_JOB, job_queue
+from climbing.schemas.score import Score
+
+RatingCacheKey = tuple[Hashable, ...]
+
+
+class RatingCacheStats(BaseModel):
+    """Модель для отображения статистики кэша рейтинга"""
+
+    hits: int = Field(..., title="Количество попаданий в кэш")
+    misses: int = Field(..., title="Количество промахов кэша")
+    size: int = Field(..., title="Текущее количество записей в кэше")
+    max_size: int = Field(..., title="Максимальное количество записей в кэше")
+    ttl: float = Field(..., title="Время жизни записи в секундах")
+
+
+class RatingCache:
+    """In-process rating cache with bounded size, TTL and LRU eviction"""
+
+    max_size: int
+    ttl: float
+    hits: int
+    misses: int
+    _entries: OrderedDict[RatingCacheKey, tuple[float, list[Score]]]
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        start_date: datetime, end_date: datetime, filter_key: str, data_version: str
+    ) -> RatingCacheKey:
+        """Returns cache key for rating with given date range and filter,
+        calculated from data with versions key data_version (see
+        DataVersions.key). Rating put by request which read data before a
+        change is stored under previous versions and isn't returned after
+        the change"""
+        return (start_date, end_date, filter_key, data_version)
+
+    def get(self, key: RatingCacheKey) -> list[Score] | None:
+        """Returns cached scores or None if there is no fresh entry for key"""
+        entry = self._entries.get(key, None)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: RatingCacheKey, scores: list[Score]) -> None:
+        """Stores scores for key, evicting least recently used entries"""
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, scores)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drops all cached ratings"""
+        self._entries.clear()
+
+    @property
+    def stats(self) -> RatingCacheStats:
+        return RatingCacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            size=len(self._entries),
+            max_size=self.max_size,
+            ttl=self.ttl,
+        )
+
+
+rating_cache = RatingCache(
+    max_size=settings.RATING_CACHE_MAX_SIZE,
+    ttl=settings.RATING_CACHE_TTL.total_seconds(),
+)
+
+
+async def invalidate_rating() -> None:
+    """Drops cached ratings and schedules recalculation of current rating, so
+    that it isn't calculated by request. Must be called after changes are
+    committed. Recalculation is delayed to handle a series of changes once"""
+    rating_cache.invalidate()
+    await job_queue.submit(
+        REFRESH_RATING_JOB, unique=True, delay=settings.RATING_REFRESH_DELAY
+    )
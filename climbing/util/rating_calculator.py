@@ -2,7 +2,6 @@ from datetime import datetime
 from uuid import UUID, uuid4
 
 from dateutil.relativedelta import relativedelta
-from fastapi import Request
 from pydantic import UUID4
 from sqlalchemy import and_, case, desc, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -10,12 +9,13 @@ from sqlalchemy.orm import aliased, selectinload
 from sqlalchemy.sql import Select
 from sqlmodel import col
 
-from climbing.core.score_maps import category_to_score_map, place_to_score_map
+from climbing.core.score_maps import category_to_score_map, rating_period
 from climbing.crud import ascent as crud_ascent
 from climbing.crud import competition_participant as crud_competition_participant
 from climbing.db.models.ascent import Ascent
 from climbing.db.models.competition import Competition
 from climbing.db.models.competition_participant import CompetitionParticipant
+from climbing.db.models.latest_ascent import LatestAscent
 from climbing.db.models.route import Route
 from climbing.db.models.user import User
 from climbing.schemas.ascent import AscentReadRatingWithRoute, AscentReadWithRoute
@@ -23,6 +23,7 @@ from climbing.schemas.base_read_classes import CompetitionRead, UserRead
 from climbing.schemas.competition_participant import CompetitionParticipantReadRating
 from climbing.schemas.filters.rating_filter import RatingFilter
 from climbing.schemas.score import Score
+from climbing.util.scoring import average_place_score, competition_ranks
 
 
 class RatingCalculator:
@@ -32,7 +33,7 @@ class RatingCalculator:
     categories_case = case(category_to_score_map, value=Route.category)
     _start_date: datetime
     _end_date: datetime
-    routes_competition_table: dict[int, list[User]]
+    routes_competition_table: dict[float, list[User]]
     user_routes_ascent_table: dict[UUID4, list[AscentReadWithRoute]]
     _filter_params: RatingFilter | None = None
     _scores: dict[UUID4, Score]
@@ -47,9 +48,25 @@ class RatingCalculator:
         self._scores = {}
 
     async def get_user_rating_ascents(
-        self, user_id: UUID4, request: Request
+        self, user_id: UUID4
     ) -> list[AscentReadRatingWithRoute]:
-        """Returns list of user's ascents with flag if it is in allowed date range"""
+        """Returns list of user's ascents with flag if it is in allowed date
+        range. As in rating, only the latest ascent of each route made before
+        the end of range is returned"""
+        latest_ascents = (
+            select(
+                col(Ascent.id),
+                func.row_number()
+                .over(
+                    partition_by=col(Ascent.route_id),
+                    order_by=desc(col(Ascent.date)),
+                )
+                .label("recency"),
+            )
+            .where(col(Ascent.user_id) == user_id)
+            .where(col(Ascent.date) <= self._end_date)
+            .subquery()
+        )
         stmt = (
             select(
                 Ascent,
@@ -59,35 +76,71 @@ class RatingCalculator:
                 ).label("taken_in_account"),
             )
             .join(Route)
-            .where(col(Ascent.user_id) == user_id)
+            .join(latest_ascents, latest_ascents.c.id == col(Ascent.id))
+            .where(latest_ascents.c.recency == 1)
             .order_by(
                 desc("taken_in_account"), desc(self.categories_case.label("route_cost"))
             )
-            .options(selectinload(Ascent.route).selectinload("*"))
+            .options(*crud_ascent.options("with_route"))
         )
 
         executed = await self.session.execute(stmt)
-        raw_result = executed.all()
-        result: list[AscentReadRatingWithRoute] = []
-        taken_in_account_count = 0
-        for row in raw_result:
-            row.t[0].set_absolute_image_urls(request=request)
-            result.append(
+        return self._order_rating_ascents(
+            [
                 AscentReadRatingWithRoute.model_validate(
                     row.t[0], update={"taken_in_account": row.t[1]}
                 )
+                for row in executed.all()
+            ]
+        )
+
+    def get_cached_user_rating_ascents(
+        self, user_id: UUID4
+    ) -> list[AscentReadRatingWithRoute]:
+        """Same as get_user_rating_ascents, but uses ascents of calculated or
+        loaded scores instead of querying database. Scores contain only the
+        latest ascent of each route, like get_user_rating_ascents"""
+        score = self._scores.get(user_id, None)
+        if score is None:
+            return []
+        return self._order_rating_ascents(
+            sorted(
+                (
+                    AscentReadRatingWithRoute.model_validate(
+                        ascent,
+                        update={
+                            "taken_in_account": self._start_date
+                            <= ascent.date
+                            <= self._end_date
+                        },
+                    )
+                    for ascent in score.ascents
+                    if ascent.date <= self._end_date
+                ),
+                key=lambda ascent: (
+                    ascent.taken_in_account,
+                    category_to_score_map.get(ascent.route.category, 0),
+                ),
+                reverse=True,
             )
-            taken_in_account_count += int(result[-1].taken_in_account)
+        )
+
+    def _order_rating_ascents(
+        self, ascents: list[AscentReadRatingWithRoute]
+    ) -> list[AscentReadRatingWithRoute]:
+        """Keeps ascents taken in account, which are sorted by route cost, at
+        the beginning and sorts others by date"""
+        taken_in_account_count = sum(int(ascent.taken_in_account) for ascent in ascents)
         date_sort_start_offset = min(
             taken_in_account_count, self.COUNT_OF_ROUTES_TAKEN_IN_ACCOUNT
         )
-        return result[:date_sort_start_offset] + sorted(
-            result[date_sort_start_offset:],
+        return ascents[:date_sort_start_offset] + sorted(
+            ascents[date_sort_start_offset:],
             key=lambda ascent: ascent.date,
             reverse=True,
         )
 
-    async def calc_routes_competition(self, request: Request) -> None:
+    async def calc_routes_competition(self) -> None:
         ascents_with_score = (
             select(
                 Ascent,
@@ -99,8 +152,6 @@ class RatingCalculator:
                 )
                 .label("route_priority"),
             )
-            .options(*crud_ascent.select_options)
-            .options(selectinload(Ascent.route))
             .where(col(Ascent.date) >= self._start_date)
             .where(col(Ascent.date) <= self._end_date)
             .join(Route)
@@ -124,7 +175,10 @@ class RatingCalculator:
             )
             .group_by(col(User.id))
             .order_by(desc("score"))
-            .options(selectinload(aliased_subq.route).selectinload("*"))
+            .options(
+                selectinload(aliased_subq.route).selectinload(Route.author),
+                selectinload(aliased_subq.route).selectinload(Route.images),
+            )
         )
 
         users_with_ascents_score = self._filtered_query(users_with_ascents_score)
@@ -139,7 +193,6 @@ class RatingCalculator:
         ).all():
             if self.user_routes_ascent_table.get(user.id, None) is None:
                 self.user_routes_ascent_table[user.id] = []
-            ascent.set_absolute_image_urls(request)
             self.user_routes_ascent_table[user.id].append(
                 AscentReadWithRoute.model_validate(ascent)
             )
@@ -214,7 +267,13 @@ class RatingCalculator:
                 )
                 .where(col(Competition.date) >= self._start_date)
                 .where(col(Competition.date) <= self._end_date)
-                .order_by(col(Competition.date), col(CompetitionParticipant.place))
+                # Participants of competitions held on the same date must not
+                # be interleaved. Order also matches participants' index
+                .order_by(
+                    col(Competition.date),
+                    col(CompetitionParticipant.competition_id),
+                    col(CompetitionParticipant.place),
+                )
             )
             return self._filtered_query(query)
 
@@ -257,31 +316,18 @@ class RatingCalculator:
                 ratio=place_people[0].competition.ratio,
             )
 
-    async def fill_ascents(self, request: Request) -> None:
-        inner_query = select(
-            Ascent,
-            func.row_number()
-            .over(
-                partition_by=[col(Ascent.user_id), col(Ascent.route_id)],
-                order_by=col(Ascent.date).desc(),
-            )
-            .label("ascent_rank"),
-        )
-        if self._filter_params is not None:
-            inner_query = inner_query.join(
-                User, onclause=col(Ascent.user_id) == col(User.id)
-            )
-            inner_query = self._filtered_query(inner_query)
-        inner_subq = inner_query.subquery()
+    async def fill_ascents(self) -> None:
         query = (
-            select(aliased(Ascent, inner_subq))
-            .where(inner_subq.c.ascent_rank == 1)
+            select(Ascent)
+            .join(LatestAscent, onclause=col(LatestAscent.ascent_id) == col(Ascent.id))
             .options(*crud_ascent.select_options)
         )
+        if self._filter_params is not None:
+            query = query.join(User, onclause=col(Ascent.user_id) == col(User.id))
+            query = self._filtered_query(query)
 
         all_ascents = (await self.session.execute(query)).scalars().all()
         for ascent in all_ascents:
-            ascent.route.set_absolute_image_urls(request)
             ascent_read = AscentReadWithRoute.model_validate(ascent)
             if ascent.user_id in self._scores:
                 self._scores[ascent.user_id].ascents.append(ascent_read)
@@ -294,6 +340,10 @@ class RatingCalculator:
                     ascents=[ascent_read],
                 )
 
+    def load_scores(self, scores: list[Score]) -> None:
+        """Fills scores dict with previously calculated scores"""
+        self._scores = {score.user.id: score for score in scores}
+
     def set_date_range(
         self, end_date: datetime, start_date: datetime | None = None
     ) -> None:
@@ -306,9 +356,7 @@ class RatingCalculator:
             seconds=59,
             microseconds=999999,
         )
-        self._start_date = start_date or (
-            self._end_date + relativedelta(months=-1, days=-15)
-        )
+        self._start_date = start_date or (self._end_date - rating_period)
 
     def _get_ascent_competition(self) -> CompetitionRead:
         """Get fake competition based on ascents"""
@@ -336,16 +384,9 @@ class RatingCalculator:
         sorted_scores = sorted(
             self._scores.values(), key=lambda score: score.score, reverse=True
         )
-        if len(sorted_scores) > 0:
-            sorted_scores[0].place = 1
-            place_people_count = 1
-            for i, score in tuple(enumerate(sorted_scores))[1:]:
-                if sorted_scores[i - 1].score != score.score:
-                    score.place = sorted_scores[i - 1].place + place_people_count
-                    place_people_count = 1
-                else:
-                    score.place = sorted_scores[i - 1].place
-                    place_people_count += 1
+        ranks = competition_ranks([score.score for score in sorted_scores])
+        for score, place in zip(sorted_scores, ranks):
+            score.place = place
         return sorted_scores
 
     @property
@@ -360,7 +401,4 @@ class RatingCalculator:
     def get_place_score(place: int, users_count: int) -> float:
         """Calculates score for place"""
 
-        return sum(
-            place_to_score_map.get(place, 0)
-            for place in range(place, users_count + place)
-        ) / (users_count)
+        return average_place_score(place, users_count)
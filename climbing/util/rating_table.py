@@ -0,0 +1,115 @@
+import csv
+from io import StringIO
+from typing import IO, Iterable, Iterator
+
+from xlsxwriter import Workbook
+
+from climbing.schemas.base_read_classes import CompetitionRead
+from climbing.schemas.score import Score
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _header(competitions: list[CompetitionRead]) -> list[str]:
+    return [
+        "Место",
+        "Имя участника",
+        *(
+            f"{competition.name} (коэфф {competition.ratio})"
+            for competition in competitions
+        ),
+        "Итого баллы",
+    ]
+
+
+def _rows(
+    competitions: list[CompetitionRead], scores: Iterable[Score]
+) -> Iterator[list[str | int | float]]:
+    for score in scores:
+        participations = {
+            participation.competition.id: participation.score
+            for participation in score.participations
+        }
+        yield [
+            score.place,
+            f"{score.user.last_name} {score.user.first_name}",
+            *(participations.get(competition.id, 0) for competition in competitions),
+            score.score,
+        ]
+
+
+def write_rating_xlsx(
+    file: IO[bytes],
+    title: str,
+    competitions: list[CompetitionRead],
+    scores: list[Score],
+) -> None:
+    """Writes rating table to file in constant memory mode. Rows are written
+    strictly in order, so worksheet is flushed to disk row by row"""
+
+    workbook = Workbook(file, {"constant_memory": True})
+    worksheet = workbook.add_worksheet()
+    header = _header(competitions)
+    # autofit() is not supported in constant memory mode
+    worksheet.set_column(0, 0, len(header[0]) + 2)
+    name_width = max(
+        [len(header[1])]
+        + [
+            len(score.user.last_name) + len(score.user.first_name) + 1
+            for score in scores
+        ]
+    )
+    worksheet.set_column(1, 1, name_width + 2)
+    for i, column_name in enumerate(header[2:], start=2):
+        worksheet.set_column(i, i, len(column_name) + 2)
+
+    title_format = workbook.add_format()
+    title_format.set_align("center")
+    worksheet.merge_range(
+        first_row=0,
+        first_col=0,
+        last_row=0,
+        last_col=len(header) - 1,
+        data=title,
+        cell_format=title_format,
+    )
+    worksheet.write_row(1, 0, header)
+    for i, row in enumerate(_rows(competitions, scores)):
+        worksheet.write_row(2 + i, 0, row)
+    workbook.close()
+
+
+def iter_file(file: IO[bytes]) -> Iterator[bytes]:
+    """Yields file content from the beginning by chunks and closes file"""
+
+    try:
+        file.seek(0)
+        while chunk := file.read(CHUNK_SIZE):
+            yield chunk
+    finally:
+        file.close()
+
+
+def iter_rating_csv(
+    title: str,
+    competitions: list[CompetitionRead],
+    scores: Iterable[Score],
+    delimiter: str = ",",
+) -> Iterator[str]:
+    """Yields rating table as CSV rows one by one"""
+
+    buffer = StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter)
+
+    def flush() -> str:
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow([title])
+    writer.writerow(_header(competitions))
+    yield flush()
+    for row in _rows(competitions, scores):
+        writer.writerow(row)
+        yield flush()
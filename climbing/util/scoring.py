@@ -0,0 +1,38 @@
+from itertools import accumulate
+from typing import Sequence
+
+from climbing.core.score_maps import place_to_score_map
+
+# place_score_prefix_sums[i] is a sum of scores for places from 1 to i
+place_score_prefix_sums: list[float] = [
+    0,
+    *accumulate(
+        place_to_score_map.get(place, 0)
+        for place in range(1, max(place_to_score_map) + 1)
+    ),
+]
+
+
+def average_place_score(place: int, users_count: int) -> float:
+    """Returns average score for users_count users sharing places from place to
+    place + users_count - 1"""
+
+    last_place = min(place + users_count - 1, len(place_score_prefix_sums) - 1)
+    if last_place < place:
+        return 0
+    return (
+        place_score_prefix_sums[last_place] - place_score_prefix_sums[place - 1]
+    ) / users_count
+
+
+def competition_ranks(sorted_scores: Sequence[float]) -> list[int]:
+    """Returns standard competition ranks ("1224") for scores sorted in
+    descending order"""
+
+    ranks: list[int] = []
+    for i, score in enumerate(sorted_scores):
+        if i > 0 and sorted_scores[i - 1] == score:
+            ranks.append(ranks[-1])
+        else:
+            ranks.append(i + 1)
+    return ranks
@@ -0,0 +1,124 @@
+"""Compares rating serialization by response_model with pre-encoded JSON.
+Run with python -m climbing.util.serialization_benchmark [--users N
+--routes N --ascents N --repeat N]. Best time of repeat runs is printed.
+
+Results on a development machine with default arguments (8.60 MiB payload),
+minimum / median / maximum of best times over several runs:
+
+- response_model + json: 299.8 / 373.1 / 450.8 ms
+- pre-encoded: 160.5 / 210.2 / 253.5 ms
+
+Pre-encoded JSON is about 1.8 times faster. With --users 30 --routes 20
+--ascents 10 (0.43 MiB) it takes 8.9 ms instead of 18.1 ms. Timings vary by
+up to 50% between runs, so compare both paths within one run"""
+
+import argparse
+import json
+import timeit
+from datetime import date, datetime, timezone
+from typing import Any, List
+from uuid import uuid4
+
+from pydantic import TypeAdapter
+
+from climbing.db.models.category import Category
+from climbing.schemas.score import Score
+from climbing.util.json_response import encode_json
+
+
+def _user(i: int) -> dict[str, Any]:
+    return {
+        "id": uuid4(),
+        "email": f"user{i}@example.com",
+        "username": f"user{i}",
+        "first_name": "Имя",
+        "last_name": f"Фамилия {i}",
+        "is_superuser": False,
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def make_scores(users_count: int, routes_count: int, ascents_count: int) -> list[Score]:
+    """Creates synthetic rating where every user climbed ascents_count of
+    routes_count routes"""
+    users = [_user(i) for i in range(users_count)]
+    categories = Category.values()
+    routes = [
+        {
+            "id": uuid4(),
+            "name": f"Трасса {i}",
+            "category": categories[i % len(categories)],
+            "mark_color": "Красный",
+            "description": "Описание трассы " * 10,
+            "creation_date": date.today(),
+            "author_id": users[i % users_count]["id"],
+            "author": users[i % users_count],
+            "created_at": datetime.now(timezone.utc),
+            "images": [
+                {
+                    "id": uuid4(),
+                    "route_id": uuid4(),
+                    "url": f"routes_images/{uuid4().hex}.jpg",
+                    "created_at": datetime.now(timezone.utc),
+                }
+                for _ in range(2)
+            ],
+        }
+        for i in range(routes_count)
+    ]
+    return [
+        Score.model_validate(
+            {
+                "user": user,
+                "place": i + 1,
+                "score": 100 - i,
+                "ascents": [
+                    {
+                        "id": uuid4(),
+                        "is_flash": False,
+                        "date": datetime.now(timezone.utc),
+                        "route": routes[(i + j) % routes_count],
+                    }
+                    for j in range(ascents_count)
+                ],
+            }
+        )
+        for i, user in enumerate(users)
+    ]
+
+
+def encode_with_response_model(scores: list[Score]) -> bytes:
+    """Reproduces FastAPI response_model path: validation, conversion to
+    jsonable python objects and encoding with stdlib json"""
+    adapter = TypeAdapter(List[Score])
+    content = adapter.dump_python(
+        adapter.validate_python(scores, from_attributes=True), mode="json"
+    )
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def main() -> None:
+    """Compares rating serialization time of response_model path and
+    pre-encoded JSON path"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--routes", type=int, default=200)
+    parser.add_argument("--ascents", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    scores = make_scores(args.users, args.routes, args.ascents)
+    size = len(encode_json(List[Score], scores, validate=False))
+    print(f"Payload size: {size / 1024 / 1024:.2f} MiB")
+    for name, encode in (
+        ("response_model + json", lambda: encode_with_response_model(scores)),
+        ("pre-encoded", lambda: encode_json(List[Score], scores, validate=False)),
+    ):
+        best = min(timeit.repeat(encode, number=1, repeat=args.repeat))
+        print(f"{name}: {best * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Any
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col
+
+from climbing.api.deps import FileStorage, StoredFile
+from climbing.core.images import IMAGE_VARIANTS, variant_name
+from climbing.core.job_queue import REMOVE_STORAGE_OBJECTS_JOB, job_queue
+from climbing.core.storage import StorageBackend, get_storage_backend
+from climbing.crud.crud_route import IMAGES_PREFIX
+from climbing.crud.crud_storage_object import storage_object as crud_storage_object
+from climbing.db.models.route_image import RouteImage
+from climbing.db.session import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+
+class GarbageCollectionReport(BaseModel):
+    """Результат сборки мусора в хранилище"""
+
+    scanned: int = Field(0, title="Количество просмотренных объектов")
+    orphaned: int = Field(0, title="Количество объектов без ссылок")
+    orphaned_bytes: int = Field(0, title="Размер объектов без ссылок в байтах")
+    removed: int = Field(0, title="Количество удалённых объектов")
+    bytes_reclaimed: int = Field(0, title="Освобождено байт")
+    failed: list[str] = Field(
+        default_factory=list, title="Объекты, которые не удалось удалить"
+    )
+
+
+async def linked_names(session: AsyncSession) -> set[str]:
+    """Returns names of all objects referenced by route images, including
+    image variants"""
+    names = await crud_storage_object.linked_names(session)
+    for url, has_variants in await session.execute(
+        select(col(RouteImage.url), col(RouteImage.has_variants))
+    ):
+        names.add(url)
+        if has_variants:
+            names.update(variant_name(url, variant) for variant in IMAGE_VARIANTS)
+    return names
+
+
+def _remove_orphans(
+    backend: StorageBackend,
+    linked: set[str],
+    prefix: str,
+    batch_size: int,
+    min_age: timedelta,
+    dry_run: bool,
+) -> GarbageCollectionReport:
+    report = GarbageCollectionReport()
+    # Objects uploaded recently may belong to not yet committed routes
+    max_last_modified = datetime.now(timezone.utc) - min_age
+    sizes: dict[str, int] = {}
+
+    def orphans():
+        for obj in backend.list(prefix):
+            report.scanned += 1
+            if obj.name in linked or obj.last_modified > max_last_modified:
+                continue
+            report.orphaned += 1
+            report.orphaned_bytes += obj.size
+            sizes[obj.name] = obj.size
+            yield obj.name
+
+    orphans_iterator = orphans()
+    while batch := list(islice(orphans_iterator, batch_size)):
+        if dry_run:
+            sizes.clear()
+            continue
+        failed = backend.remove_batch(batch)
+        report.failed.extend(failed)
+        for name in set(batch).difference(failed):
+            report.removed += 1
+            report.bytes_reclaimed += sizes.pop(name)
+        for name in failed:
+            sizes.pop(name, None)
+    return report
+
+
+async def collect_garbage(
+    session: AsyncSession,
+    backend: StorageBackend | None = None,
+    prefix: str = IMAGES_PREFIX,
+    batch_size: int = 1000,
+    min_age: timedelta = timedelta(hours=1),
+    dry_run: bool = False,
+) -> GarbageCollectionReport:
+    """Removes objects with prefix which aren't referenced by any route image.
+    Bucket listing is streamed and orphans are removed in batches of
+    batch_size objects. With dry_run orphans are only counted in orphaned and
+    orphaned_bytes, and nothing is reported as removed"""
+    linked = await linked_names(session)
+    report = await run_in_threadpool(
+        _remove_orphans,
+        backend or get_storage_backend(),
+        linked,
+        prefix,
+        batch_size,
+        min_age,
+        dry_run,
+    )
+    logger.info(
+        "Storage garbage collection: scanned %d, orphaned %d (%d bytes),"
+        " removed %d, reclaimed %d bytes, failed %d",
+        report.scanned,
+        report.orphaned,
+        report.orphaned_bytes,
+        report.removed,
+        report.bytes_reclaimed,
+        len(report.failed),
+    )
+    return report
+
+
+@job_queue.handler(REMOVE_STORAGE_OBJECTS_JOB)
+async def remove_objects(payload: dict[str, Any]) -> None:
+    """Removes objects which are no longer referenced together with their
+    variants. References are checked again on every attempt, because the
+    same content may be uploaded after removal is scheduled. Failed job is
+    retried; objects left after last attempt are removed by garbage
+    collection"""
+    images = [
+        StoredFile(name, has_variants) for name, has_variants in payload["images"]
+    ]
+    async with async_session_maker() as session:
+        referenced = await crud_storage_object.referenced_names(
+            session, (image.name for image in images)
+        )
+    failed = await FileStorage().remove_images_in_batches(
+        image for image in images if image.name not in referenced
+    )
+    if len(failed) > 0:
+        raise RuntimeError(f"Failed to remove {len(failed)} storage objects")
+
+
+async def run_periodically(interval: timedelta) -> None:
+    """Runs garbage collection every interval until cancelled"""
+    while True:
+        await asyncio.sleep(interval.total_seconds())
+        try:
+            async with async_session_maker() as session:
+                await collect_garbage(session)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Storage garbage collection failed")
+
+
+def main() -> None:
+    """CLI entry point for storage garbage collection"""
+    parser = argparse.ArgumentParser(
+        description="Remove route images which aren't referenced from database"
+    )
+    parser.add_argument("--prefix", default=IMAGES_PREFIX)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--min-age-minutes",
+        type=int,
+        default=60,
+        help="skip objects modified less than this number of minutes ago",
+    )
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    async def run() -> GarbageCollectionReport:
+        backend = get_storage_backend()
+        await run_in_threadpool(backend.prepare)
+        async with async_session_maker() as session:
+            return await collect_garbage(
+                session,
+                backend,
+                prefix=args.prefix,
+                batch_size=args.batch_size,
+                min_age=timedelta(minutes=args.min_age_minutes),
+                dry_run=args.dry_run,
+            )
+
+    print(asyncio.run(run()).model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""Tests of climbing. Settings are read when climbing modules are imported,
+so test environment is configured here, before conftest imports them"""
+
+import os
+import tempfile
+from typing import Any
+
+TMP_DIR = tempfile.mkdtemp(prefix="climbing-tests-")
+
+os.environ.setdefault(
+    "SQLALCHEMY_DATABASE_URI", f"sqlite+aiosqlite:///{TMP_DIR}/climbing.db"
+)
+os.environ.setdefault("MEDIA_ROOT", os.path.join(TMP_DIR, "media"))
+os.environ.setdefault("STORAGE_BACKEND", "local")
+os.environ.setdefault("MAIL_USERNAME", "climbing@example.com")
+os.environ.setdefault("MAIL_SMTP_HOST", "127.0.0.1")
+os.environ.setdefault("MAIL_SMTP_PORT", "25")
+os.environ.setdefault("MAIL_EXTERNAL_APP_PASSWORD", "")
+os.environ.setdefault("MAIL_USE_SSL", "false")
+os.environ.setdefault("MINIO_ACCESS_KEY", "test")
+os.environ.setdefault("MINIO_SECRET_KEY", "test")
+os.environ.setdefault("SECRET", "test-secret")
+os.environ.setdefault("JOB_WORKERS", "0")
+
+# SQL statement with its parameters recorded by statements fixture
+Statement = tuple[str, Any]
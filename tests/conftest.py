@@ -0,0 +1,53 @@
+from typing import AsyncGenerator, Generator
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel
+
+from climbing.db import models  # pylint: disable=unused-import
+from climbing.db.session import async_session_maker, engine, read_engine
+from climbing.main import app
+from tests import Statement
+
+
+@pytest.fixture
+async def database() -> AsyncGenerator[None, None]:
+    """Creates all tables in test database and drops them after test"""
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    yield
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.drop_all)
+
+
+@pytest.fixture
+async def session(database: None) -> AsyncGenerator[AsyncSession, None]:
+    async with async_session_maker() as new_session:
+        yield new_session
+
+
+@pytest.fixture
+def statements() -> Generator[list[Statement], None, None]:
+    """Records SQL statements executed by primary engine together with their
+    parameters"""
+    recorded: list[Statement] = []
+
+    def record(_connection, _cursor, statement, parameters, _context, _many):
+        recorded.append((statement, parameters))
+
+    engines = {engine.sync_engine, read_engine.sync_engine}
+    for recorded_engine in engines:
+        event.listen(recorded_engine, "before_cursor_execute", record)
+    yield recorded
+    for recorded_engine in engines:
+        event.remove(recorded_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+async def client(database: None) -> AsyncGenerator[AsyncClient, None]:
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as new_client:
+        yield new_client
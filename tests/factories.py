@@ -0,0 +1,93 @@
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from climbing.db.models import (
+    Ascent,
+    Category,
+    Competition,
+    CompetitionParticipant,
+    LatestAscent,
+    Route,
+    RouteImage,
+    StorageObject,
+    User,
+)
+from climbing.db.models.user import SexEnum
+
+
+def make_user(number: int, **fields) -> User:
+    # Table models aren't validated, so enum default isn't converted
+    fields.setdefault("sex", SexEnum.male.value)
+    return User(
+        email=f"user{number}@example.com",
+        username=f"user{number}",
+        first_name="Имя",
+        last_name=f"Фамилия {number}",
+        hashed_password="hashed",
+        **fields,
+    )
+
+
+async def populate(session: AsyncSession, count: int, start: int = 0) -> list[User]:
+    """Creates count users numbered from start. Every user has a route with
+    two images, ascents of all created routes and participation in every
+    created competition. There is one competition per user"""
+    users = [make_user(start + i) for i in range(count)]
+    session.add_all(users)
+    routes = [
+        Route(
+            name=f"Трасса {i}",
+            category=Category.values()[i % len(Category.values())],
+            mark_color="Красный",
+            description="Описание",
+            creation_date=date.today(),
+            author_id=user.id,
+        )
+        for i, user in enumerate(users)
+    ]
+    session.add_all(routes)
+    for route in routes:
+        for i in range(2):
+            name = f"routes_images/{route.id.hex}-{i}.jpg"
+            session.add(RouteImage(url=name, route_id=route.id))
+            session.add(StorageObject(name=name, ref_count=1))
+    now = datetime.now(timezone.utc)
+    ascents = [
+        Ascent(
+            is_flash=False,
+            date=now - timedelta(days=i),
+            user_id=user.id,
+            route_id=route.id,
+        )
+        for user in users
+        for i, route in enumerate(routes)
+    ]
+    session.add_all(ascents)
+    # LatestAscent has no relationships, so flush order isn't known to ORM
+    await session.flush()
+    session.add_all(
+        LatestAscent(
+            user_id=ascent.user_id, route_id=ascent.route_id, ascent_id=ascent.id
+        )
+        for ascent in ascents
+    )
+    competitions = [
+        Competition(
+            name=f"Соревнование {i}",
+            date=date.today() - timedelta(days=i),
+            ratio=1,
+            organizer_id=user.id,
+        )
+        for i, user in enumerate(users)
+    ]
+    session.add_all(competitions)
+    session.add_all(
+        CompetitionParticipant(
+            competition_id=competition.id, user_id=user.id, place=place + 1
+        )
+        for competition in competitions
+        for place, user in enumerate(users)
+    )
+    await session.commit()
+    return users
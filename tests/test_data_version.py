@@ -0,0 +1,90 @@
+"""Data versions are stored in database, so ETags issued by one process are
+revalidated correctly by the others"""
+
+from datetime import date
+
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from climbing.core.job_queue import job_queue
+from climbing.db.data_version import data_versions
+from climbing.db.models import Category, Job, Route, User
+from climbing.db.session import async_session_maker
+from tests.factories import populate
+
+
+async def versions(*tables: str) -> dict[str, int]:
+    async with async_session_maker() as session:
+        return await data_versions.versions(session, tables)
+
+
+async def test_versions_are_bumped_in_transaction(session: AsyncSession):
+    [user] = await populate(session, 1)
+    user_id = user.id
+    tables = (User.__tablename__, Route.__tablename__, Job.__tablename__)
+    before = await versions(*tables)
+
+    user.first_name = "Другое имя"
+    await session.flush()
+    await session.rollback()
+    await job_queue.enqueue(session, "test_job")
+    await session.commit()
+    assert await versions(*tables) == before
+
+    session.add(
+        Route(
+            name="Новая трасса",
+            category=Category.values()[0],
+            mark_color="Синий",
+            description="Описание",
+            creation_date=date.today(),
+            author_id=user_id,
+        )
+    )
+    await session.commit()
+    after = await versions(Route.__tablename__)
+    assert after[Route.__tablename__] == before[Route.__tablename__] + 1
+
+
+async def test_etag_is_revalidated_after_change(
+    client: AsyncClient, session: AsyncSession
+):
+    [user] = await populate(session, 1)
+    response = await client.get("/api/v1/routes")
+    etag = response.headers["ETag"]
+
+    response = await client.get("/api/v1/routes", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # Change made through another session, as another process would do
+    async with async_session_maker() as other_session:
+        other_user = await other_session.get(User, user.id)
+        assert other_user is not None
+        other_user.first_name = "Другое имя"
+        await other_session.commit()
+
+    response = await client.get("/api/v1/routes", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+async def test_rating_etag_and_body_use_same_versions(
+    client: AsyncClient, session: AsyncSession
+):
+    [user] = await populate(session, 1)
+    response = await client.get("/api/v1/rating")
+    etag = response.headers["ETag"]
+
+    # Another process changes user and invalidates only its own rating cache
+    async with async_session_maker() as other_session:
+        other_user = await other_session.get(User, user.id)
+        assert other_user is not None
+        other_user.first_name = "Другое имя"
+        await other_session.commit()
+
+    response = await client.get("/api/v1/rating", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [score["user"]["first_name"] for score in response.json()] == ["Другое имя"]
+    etag = response.headers["ETag"]
+    response = await client.get("/api/v1/rating", headers={"If-None-Match": etag})
+    assert response.status_code == 304
@@ -0,0 +1,88 @@
+"""Claimed job must stay with its worker while it runs and must not be changed
+by a worker which has lost it"""
+
+import asyncio
+from datetime import timedelta
+from typing import Any
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from climbing.core.config import settings
+from climbing.core.job_queue import job_queue
+from climbing.crud.crud_job import job as crud_job
+from climbing.db.models.job import Job, JobStatus
+from climbing.util.job_workers import run_job
+
+TEST_JOB = "test_job"
+
+
+@pytest.fixture
+def short_lease(monkeypatch: pytest.MonkeyPatch) -> timedelta:
+    lease = timedelta(seconds=0.3)
+    monkeypatch.setattr(settings, "JOB_LEASE", lease)
+    return lease
+
+
+async def add_job(session: AsyncSession) -> Job:
+    await job_queue.enqueue(session, TEST_JOB)
+    await session.commit()
+    claimed = await crud_job.claim(session, settings.JOB_LEASE)
+    assert claimed is not None
+    return claimed
+
+
+async def test_lease_is_extended_while_job_runs(
+    session: AsyncSession, short_lease: timedelta, monkeypatch: pytest.MonkeyPatch
+):
+    claims: list[Job | None] = []
+
+    async def slow_handler(_payload: dict[str, Any]) -> None:
+        await asyncio.sleep(short_lease.total_seconds() * 3)
+        claims.append(await crud_job.claim(session, short_lease))
+
+    monkeypatch.setitem(job_queue._handlers, TEST_JOB, slow_handler)
+    claimed = await add_job(session)
+
+    await run_job(claimed)
+
+    assert claims == [None]
+    assert await session.get(Job, claimed.id, populate_existing=True) is None
+
+
+async def test_hung_job_is_retried_after_timeout(
+    session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    async def hung_handler(_payload: dict[str, Any]) -> None:
+        await asyncio.Event().wait()
+
+    monkeypatch.setitem(job_queue._handlers, TEST_JOB, hung_handler)
+    monkeypatch.setattr(settings, "JOB_TIMEOUT", timedelta(seconds=0.1))
+    claimed = await add_job(session)
+
+    await run_job(claimed)
+
+    retried = await session.get(Job, claimed.id, populate_existing=True)
+    assert retried is not None
+    assert retried.status == JobStatus.PENDING
+    assert "TimeoutError" in (retried.last_error or "")
+
+
+async def test_reclaimed_job_is_not_changed_by_previous_worker(
+    session: AsyncSession,
+):
+    claimed = await add_job(session)
+    stale = Job.model_validate(claimed.model_dump())
+    # Lock of previous worker has expired and job is claimed again
+    await crud_job.extend_lease(session, claimed, timedelta(seconds=-1))
+    reclaimed = await crud_job.claim(session, settings.JOB_LEASE)
+    assert reclaimed is not None
+
+    assert not await crud_job.extend_lease(session, stale, settings.JOB_LEASE)
+    await crud_job.complete(session, stale)
+    await crud_job.fail(session, stale, "stale")
+
+    current = await session.get(Job, claimed.id, populate_existing=True)
+    assert current is not None
+    assert current.status == JobStatus.RUNNING
+    assert current.attempts == 2
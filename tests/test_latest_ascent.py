@@ -0,0 +1,113 @@
+"""Latest ascents are refreshed in the same transaction as ascents"""
+
+from datetime import datetime, timezone
+
+import pytest
+from pydantic import UUID4
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col
+
+from climbing.crud.crud_ascent import ascent as crud_ascent
+from climbing.crud.crud_rating_snapshot import rating_snapshot
+from climbing.db.models import Ascent, AscentCreate, LatestAscent, Route
+from climbing.db.session import async_session_maker
+from tests import Statement
+from tests.factories import populate
+
+
+async def latest_ascent_id(user_id: UUID4, route_id: UUID4) -> UUID4 | None:
+    async with async_session_maker() as session:
+        return (
+            await session.scalars(
+                select(col(LatestAscent.ascent_id))
+                .where(col(LatestAscent.user_id) == user_id)
+                .where(col(LatestAscent.route_id) == route_id)
+            )
+        ).one_or_none()
+
+
+async def test_latest_ascent_follows_changes(session: AsyncSession):
+    [user] = await populate(session, 1)
+    route_id = (
+        await session.scalars(select(col(Route.id)).where(Route.author_id == user.id))
+    ).one()
+
+    created = await crud_ascent.create(
+        session,
+        AscentCreate(
+            is_flash=True,
+            date=datetime.now(timezone.utc),
+            user_id=user.id,
+            route_id=route_id,
+        ),
+    )
+    assert await latest_ascent_id(user.id, route_id) == created.id
+
+    await crud_ascent.remove(session, row_id=created.id)
+    assert await latest_ascent_id(user.id, route_id) != created.id
+
+
+async def test_failed_change_is_rolled_back_with_latest_ascent(
+    session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    [user] = await populate(session, 1)
+    route_id = (
+        await session.scalars(select(col(Route.id)).where(Route.author_id == user.id))
+    ).one()
+    ascents_count = select(func.count()).select_from(Ascent)
+    count_before = (await session.execute(ascents_count)).scalar_one()
+    user_id = user.id
+    latest_before = await latest_ascent_id(user_id, route_id)
+
+    async def fail(*_args) -> None:
+        raise RuntimeError("Snapshot invalidation failed")
+
+    monkeypatch.setattr(rating_snapshot, "invalidate", fail)
+    with pytest.raises(RuntimeError):
+        await crud_ascent.create(
+            session,
+            AscentCreate(
+                is_flash=True,
+                date=datetime.now(timezone.utc),
+                user_id=user.id,
+                route_id=route_id,
+            ),
+        )
+    await session.rollback()
+
+    assert (await session.execute(ascents_count)).scalar_one() == count_before
+    assert await latest_ascent_id(user_id, route_id) == latest_before
+
+
+async def test_existing_latest_ascent_is_updated_in_place(
+    session: AsyncSession, statements: list[Statement]
+):
+    [user] = await populate(session, 1)
+    route_id = (
+        await session.scalars(select(col(Route.id)).where(Route.author_id == user.id))
+    ).one()
+    newest = Ascent(
+        is_flash=True,
+        date=datetime.now(timezone.utc),
+        user_id=user.id,
+        route_id=route_id,
+    )
+    session.add(newest)
+    await session.flush()
+    statements.clear()
+
+    await crud_ascent.refresh_latest(session, (user.id, route_id))
+    await session.commit()
+
+    assert await latest_ascent_id(user.id, route_id) == newest.id
+    # Row inserted by concurrent transaction after the check would make
+    # DELETE and INSERT fail on primary key, upsert updates it instead
+    changes = [
+        statement
+        for statement, _ in statements
+        if "latestascent" in statement and not statement.startswith("SELECT")
+    ]
+    assert len(changes) == 1
+    assert changes[0].startswith("INSERT")
+    assert "ON CONFLICT" in changes[0]
@@ -0,0 +1,130 @@
+"""Emails are sent to local SMTP stand-in, which records received messages"""
+
+import smtplib
+import socket
+import socketserver
+import threading
+from datetime import timedelta
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+from typing import Generator
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from climbing.core.config import settings
+from climbing.core.job_queue import SEND_MAIL_JOB, job_queue
+from climbing.core.mail import send_mail
+from climbing.crud.crud_job import job as crud_job
+from climbing.db.models.job import Job, JobStatus
+from climbing.util.job_workers import run_job
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal SMTP dialog without authentication and extensions"""
+
+    server: "SMTPServer"
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        self.reply("220 localhost")
+        while line := self.rfile.readline():
+            command = line.decode().strip().upper()
+            if command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b""
+                while (data_line := self.rfile.readline()) != b".\r\n":
+                    data += data_line
+                self.server.messages.append(
+                    message_from_bytes(data, EmailMessage, policy=policy.default)
+                )
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            elif command.startswith(("EHLO", "HELO")):
+                self.reply("250 localhost")
+            else:
+                self.reply("250 OK")
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    messages: list[EmailMessage]
+
+
+@pytest.fixture
+def smtp_server(monkeypatch: pytest.MonkeyPatch) -> Generator[SMTPServer, None, None]:
+    server = SMTPServer(("127.0.0.1", 0), SMTPHandler)
+    server.messages = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(settings, "MAIL_SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "MAIL_SMTP_PORT", server.server_address[1])
+    monkeypatch.setattr(settings, "MAIL_USE_SSL", False)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def silent_server(monkeypatch: pytest.MonkeyPatch) -> Generator[None, None, None]:
+    """Server which accepts connections but never answers"""
+    listener = socket.create_server(("127.0.0.1", 0))
+    monkeypatch.setattr(settings, "MAIL_SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "MAIL_SMTP_PORT", listener.getsockname()[1])
+    monkeypatch.setattr(settings, "MAIL_USE_SSL", False)
+    monkeypatch.setattr(settings, "MAIL_SMTP_TIMEOUT", timedelta(seconds=0.2))
+    yield
+    listener.close()
+
+
+def test_send_mail(smtp_server: SMTPServer):
+    send_mail("user@example.com", "Тема", "Текст письма")
+
+    [message] = smtp_server.messages
+    assert message["Subject"] == "Тема"
+    assert message.get_content().strip() == "Текст письма"
+
+
+def test_send_mail_times_out(silent_server: None):
+    with pytest.raises(smtplib.SMTPServerDisconnected, match="timed out"):
+        send_mail("user@example.com", "Тема", "Текст письма")
+
+
+async def test_mail_job(session: AsyncSession, smtp_server: SMTPServer):
+    await job_queue.enqueue(
+        session,
+        SEND_MAIL_JOB,
+        {"to": "user@example.com", "subject": "Тема", "text": "token"},
+    )
+    await session.commit()
+    claimed = await crud_job.claim(session, settings.JOB_LEASE)
+    assert claimed is not None
+
+    await run_job(claimed)
+
+    assert len(smtp_server.messages) == 1
+    assert await session.get(Job, claimed.id, populate_existing=True) is None
+
+
+async def test_failed_mail_job_is_scrubbed(
+    session: AsyncSession, silent_server: None, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(settings, "JOB_MAX_ATTEMPTS", 1)
+    await job_queue.enqueue(
+        session,
+        SEND_MAIL_JOB,
+        {"to": "user@example.com", "subject": "Тема", "text": "token"},
+    )
+    await session.commit()
+    claimed = await crud_job.claim(session, settings.JOB_LEASE)
+    assert claimed is not None
+
+    await run_job(claimed)
+
+    failed = await session.get(Job, claimed.id, populate_existing=True)
+    assert failed is not None
+    assert failed.status == JobStatus.FAILED
+    assert failed.payload == {}
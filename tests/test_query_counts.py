@@ -0,0 +1,60 @@
+"""List and detail endpoints must load related objects with a fixed number
+of statements, whatever number of rows is returned"""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from climbing.db.models import Ascent, Route
+from tests import Statement
+from tests.factories import populate
+
+# Query of data versions for ETag, main query and one SELECT ... IN per eagerly
+# loaded relationship of endpoint's load plan
+LIST_STATEMENTS = {"routes": 4, "ascents": 6, "competitions": 5}
+# Competitions are served only as a list. Details aren't conditional
+DETAIL_STATEMENTS = {"routes": 3, "ascents": 5}
+MODELS = {"routes": Route, "ascents": Ascent}
+
+
+async def count_statements(
+    client: AsyncClient, statements: list[Statement], url: str
+) -> int:
+    statements.clear()
+    response = await client.get(url)
+    assert response.status_code == 200, response.text
+    return len(statements)
+
+
+@pytest.mark.parametrize("path", LIST_STATEMENTS)
+async def test_list_statements_count(
+    client: AsyncClient,
+    session: AsyncSession,
+    statements: list[Statement],
+    path: str,
+):
+    await populate(session, 2)
+    few_rows = await count_statements(client, statements, f"/api/v1/{path}")
+    await populate(session, 5, start=2)
+    many_rows = await count_statements(client, statements, f"/api/v1/{path}")
+
+    assert few_rows == LIST_STATEMENTS[path]
+    assert many_rows == LIST_STATEMENTS[path]
+
+
+@pytest.mark.parametrize("path", DETAIL_STATEMENTS)
+async def test_detail_statements_count(
+    client: AsyncClient,
+    session: AsyncSession,
+    statements: list[Statement],
+    path: str,
+):
+    await populate(session, 5)
+    row_id = (
+        await session.execute(select(MODELS[path].id).limit(1))  # type: ignore
+    ).scalar_one()
+
+    detail = await count_statements(client, statements, f"/api/v1/{path}/{row_id}")
+
+    assert detail == DETAIL_STATEMENTS[path]
@@ -0,0 +1,79 @@
+"""Cached rating is bound to data versions, so rating calculated before a
+change isn't returned after it"""
+
+from datetime import datetime
+from typing import Any, AsyncGenerator
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from climbing.api.api_v1.endpoints.rating import (
+    RATING_TABLES,
+    prepare_rating,
+    refresh_rating,
+)
+from climbing.db.data_version import data_versions
+from climbing.db.models import RatingSnapshot, User
+from climbing.db.session import async_session_maker
+from climbing.schemas.filters.rating_filter import RatingFilter
+from climbing.util.rating_cache import rating_cache
+from climbing.util.rating_calculator import RatingCalculator
+from tests.factories import populate
+
+
+@pytest.fixture(autouse=True)
+async def empty_cache() -> AsyncGenerator[None, None]:
+    rating_cache.invalidate()
+    yield
+    rating_cache.invalidate()
+
+
+async def test_rating_calculated_before_change_isnt_returned(
+    session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    [user] = await populate(session, 1)
+    fill_other_competition_scores = RatingCalculator.fill_other_competition_scores
+
+    async def fill_and_change(calc: RatingCalculator) -> None:
+        await fill_other_competition_scores(calc)
+        # Change is committed and cache is invalidated while rating is
+        # calculated
+        async with async_session_maker() as other_session:
+            other_user = await other_session.get(User, user.id)
+            assert other_user is not None
+            other_user.first_name = "Другое имя"
+            await other_session.commit()
+        rating_cache.invalidate()
+
+    monkeypatch.setattr(
+        RatingCalculator, "fill_other_competition_scores", fill_and_change
+    )
+    await prepare_rating(session, None)
+    monkeypatch.undo()
+
+    async with async_session_maker() as new_session:
+        calc = await prepare_rating(new_session, None)
+    assert [score.user.first_name for score in calc.scores] == ["Другое имя"]
+
+
+async def test_refresh_job_doesnt_read_cache(session: AsyncSession):
+    await populate(session, 3)
+    calc = await prepare_rating(session, None)
+    versions = await data_versions.versions(session, RATING_TABLES)
+    rating_cache.put(
+        rating_cache.make_key(
+            calc.start_date,
+            calc.end_date,
+            RatingFilter().key,
+            data_versions.key(versions),
+        ),
+        [],
+    )
+
+    await refresh_rating({})
+
+    snapshot_rows = await session.execute(
+        select(func.count()).select_from(RatingSnapshot)
+    )
+    assert snapshot_rows.scalar_one() == 3
@@ -0,0 +1,155 @@
+"""Rating engine is selected by database dialect by default. SQL and in-memory
+engines calculate equal ratings"""
+
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from climbing.core.config import settings
+from climbing.db.models import (
+    Ascent,
+    Category,
+    Competition,
+    CompetitionParticipant,
+    Route,
+)
+from climbing.db.models.user import SexEnum
+from climbing.schemas.filters.rating_filter import RatingFilter
+from climbing.util.in_memory_rating_calculator import (
+    InMemoryRatingCalculator,
+    create_rating_calculator,
+)
+from climbing.util.rating_calculator import RatingCalculator
+from tests.factories import make_user
+
+
+@pytest.mark.parametrize(
+    "dialect, engine, calculator_type",
+    [
+        ("sqlite", "auto", RatingCalculator),
+        ("postgresql", "auto", InMemoryRatingCalculator),
+        ("sqlite", "memory", InMemoryRatingCalculator),
+    ],
+)
+def test_rating_engine_selection(
+    session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+    dialect: str,
+    engine: str,
+    calculator_type: type[RatingCalculator],
+):
+    monkeypatch.setattr(session.get_bind().dialect, "name", dialect)
+    monkeypatch.setattr(settings, "RATING_ENGINE", engine)
+
+    calculator = create_rating_calculator(session)
+
+    assert type(calculator) is calculator_type
+
+
+async def add_rating_data(session: AsyncSession) -> None:
+    """Ascents with ties, repeated and flash ascents, ascents out of the
+    default rating period and a competition with shared place"""
+    users = [make_user(i) for i in range(6)]
+    users[4].is_student = True
+    users[5].sex = SexEnum.female.value
+    session.add_all(users)
+    categories = Category.values()
+    routes = [
+        Route(
+            name=f"Трасса {i}",
+            category=categories[(i * 3) % len(categories)],
+            mark_color="Красный",
+            description="Описание",
+            creation_date=date.today(),
+            author_id=users[0].id,
+        )
+        for i in range(7)
+    ]
+    session.add_all(routes)
+    now = datetime.now(timezone.utc)
+    ascents = [
+        # More routes than taken in account, first one is repeated
+        *[(0, i, 1 + i, i % 2 == 0) for i in range(7)],
+        (0, 0, 20, False),
+        # Tie of users with the same routes climbed with and without flash
+        (1, 1, 2, True),
+        (1, 2, 3, True),
+        (2, 1, 4, False),
+        (2, 2, 5, False),
+        (2, 2, 6, True),
+        # Ascents out of the default period
+        (3, 5, 60, False),
+        (3, 6, 70, True),
+        (4, 3, 1, True),
+        (4, 3, 80, False),
+        (5, 4, 35, False),
+        (5, 5, 90, True),
+    ]
+    session.add_all(
+        Ascent(
+            is_flash=is_flash,
+            date=now - timedelta(days=days),
+            user_id=users[user].id,
+            route_id=routes[route].id,
+        )
+        for user, route, days, is_flash in ascents
+    )
+    competition = Competition(
+        name="Соревнование",
+        date=date.today() - timedelta(days=3),
+        ratio=1,
+        organizer_id=users[0].id,
+    )
+    session.add(competition)
+    session.add_all(
+        CompetitionParticipant(
+            competition_id=competition.id, user_id=users[user].id, place=place
+        )
+        for user, place in [(3, 1), (1, 2), (5, 2), (0, 4)]
+    )
+    await session.commit()
+
+
+@pytest.mark.parametrize("start_days", [None, 45, 100])
+@pytest.mark.parametrize("end_days", [0, 30])
+@pytest.mark.parametrize(
+    "rating_filter",
+    [None, RatingFilter(is_student=False), RatingFilter(sex=SexEnum.female)],
+)
+async def test_rating_engines_give_equal_scores(
+    session: AsyncSession,
+    start_days: int | None,
+    end_days: int,
+    rating_filter: RatingFilter | None,
+):
+    await add_rating_data(session)
+    end_date = datetime.now() - timedelta(days=end_days)
+    start_date = None if start_days is None else end_date - timedelta(days=start_days)
+
+    results = []
+    for calculator_type in (RatingCalculator, InMemoryRatingCalculator):
+        calc = calculator_type(session=session, filter_params=rating_filter)
+        calc.set_date_range(end_date=end_date, start_date=start_date)
+        await calc.fill_ascents()
+        await calc.calc_routes_competition()
+        await calc.fill_other_competition_scores()
+        calc.fill_routes_competition_scores()
+        results.append(
+            {
+                score.user.id: (
+                    score.place,
+                    score.score,
+                    score.ascents_score,
+                    sorted(
+                        (participation.competition.name, participation.place)
+                        for participation in score.participations
+                    ),
+                )
+                for score in calc.scores
+            }
+        )
+
+    sql_result, in_memory_result = results
+    assert sql_result
+    assert in_memory_result == sql_result
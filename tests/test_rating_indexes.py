@@ -0,0 +1,97 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col
+
+from climbing.crud.crud_ascent import ascent as crud_ascent
+from climbing.db.models import Route
+from climbing.util.in_memory_rating_calculator import InMemoryRatingCalculator
+from climbing.util.rating_calculator import RatingCalculator
+from tests import Statement
+from tests.factories import populate
+
+
+async def query_plan(session: AsyncSession, statement: Statement) -> str:
+    sql, parameters = statement
+    connection = await session.connection()
+    rows = await connection.exec_driver_sql(
+        f"EXPLAIN QUERY PLAN {sql}", tuple(parameters)
+    )
+    return "\n".join(row[-1] for row in rows)
+
+
+def find_statement(statements: list[Statement], *fragments: str) -> Statement:
+    matching = [
+        statement
+        for statement in statements
+        if all(fragment in statement[0] for fragment in fragments)
+    ]
+    assert len(matching) == 1, f"Expected one statement with {fragments}"
+    return matching[0]
+
+
+@pytest.mark.parametrize(
+    "calculator_class", [RatingCalculator, InMemoryRatingCalculator]
+)
+async def test_routes_competition_uses_ascent_date_index(
+    session: AsyncSession, statements: list[Statement], calculator_class
+):
+    calc = calculator_class(session)
+    calc.set_date_range(datetime.now())
+    await calc.calc_routes_competition()
+
+    statement = find_statement(
+        statements, "FROM ascent", "ascent.date >=", "route_cost"
+    )
+    assert "ix_ascent_date_user_id_route_id" in await query_plan(session, statement)
+
+
+async def test_in_memory_calculator_selects_users_by_ascents_subquery(
+    session: AsyncSession, statements: list[Statement]
+):
+    await populate(session, 3)
+    calc = InMemoryRatingCalculator(session)
+    calc.set_date_range(datetime.now())
+    statements.clear()
+    await calc.calc_routes_competition()
+
+    sql, parameters = find_statement(statements, "user.id IN (SELECT")
+    # Only date range is passed, not ids of users
+    assert len(parameters) == 2
+    assert "ix_ascent_date_user_id_route_id" in await query_plan(
+        session, (sql, parameters)
+    )
+    assert len(calc.routes_competition_table) > 0
+
+
+async def test_competition_scores_use_date_and_place_indexes(
+    session: AsyncSession, statements: list[Statement]
+):
+    calc = RatingCalculator(session)
+    calc.set_date_range(datetime.now())
+    await calc.fill_other_competition_scores()
+
+    plan = await query_plan(
+        session,
+        find_statement(statements, "FROM competitionparticipant", "competition.date"),
+    )
+    assert "ix_competition_date" in plan
+    assert "ix_competitionparticipant_competition_id_place" in plan
+
+
+async def test_latest_ascent_lookup_uses_user_route_date_index(
+    session: AsyncSession, statements: list[Statement]
+):
+    [user] = await populate(session, 1)
+    [route_id] = (
+        await session.scalars(select(col(Route.id)).where(Route.author_id == user.id))
+    ).all()
+    statements.clear()
+    await crud_ascent.refresh_latest(session, (user.id, route_id))
+
+    plan = await query_plan(
+        session, find_statement(statements, "FROM ascent", "ORDER BY ascent.date")
+    )
+    assert "ix_ascent_user_id_route_id_date" in plan
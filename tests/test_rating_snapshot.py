@@ -0,0 +1,143 @@
+"""Rating snapshots are stored only when rating is calculated from primary
+database and are invalidated together with changes of data"""
+
+from datetime import date
+from typing import Any, AsyncGenerator
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from climbing.api.api_v1.endpoints.rating import (
+    RATING_TABLES,
+    prepare_rating,
+    refresh_rating,
+)
+from climbing.core.config import settings
+from climbing.crud.crud_rating_snapshot import rating_snapshot as crud_rating_snapshot
+from climbing.db.data_version import data_versions
+from climbing.db.models import RatingSnapshot, RatingSnapshotHeader, User
+from climbing.db.session import async_session_maker
+from climbing.util.rating_cache import rating_cache
+from tests.factories import populate
+
+
+@pytest.fixture(autouse=True)
+async def empty_cache() -> AsyncGenerator[None, None]:
+    rating_cache.invalidate()
+    yield
+    rating_cache.invalidate()
+
+
+@pytest.fixture
+def replica(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        settings, "SQLALCHEMY_READ_DATABASE_URI", settings.SQLALCHEMY_DATABASE_URI
+    )
+
+
+async def snapshot_rows(session: AsyncSession, model: Any = RatingSnapshot) -> int:
+    return (await session.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+async def rename_user(user_id: Any) -> None:
+    """Changes user through another session, as another request would do"""
+    async with async_session_maker() as other_session:
+        user = await other_session.get(User, user_id)
+        assert user is not None
+        user.first_name = "Другое имя"
+        await crud_rating_snapshot.invalidate(other_session)
+        await other_session.commit()
+
+
+async def test_rating_is_stored_without_replica(
+    client: AsyncClient, session: AsyncSession
+):
+    await populate(session, 3)
+
+    response = await client.get("/api/v1/rating")
+
+    assert response.status_code == 200
+    assert await snapshot_rows(session) == 3
+
+
+async def test_rating_from_replica_isnt_stored(
+    client: AsyncClient, session: AsyncSession, replica: None
+):
+    await populate(session, 3)
+
+    response = await client.get("/api/v1/rating")
+
+    assert response.status_code == 200
+    assert await snapshot_rows(session) == 0
+
+
+async def test_refresh_job_stores_rating_from_primary(
+    session: AsyncSession, replica: None
+):
+    await populate(session, 3)
+
+    await refresh_rating({})
+
+    assert await snapshot_rows(session) == 3
+
+
+async def test_empty_rating_snapshot_is_stored(session: AsyncSession):
+    day = date.today()
+    versions = await data_versions.versions(session, RATING_TABLES)
+    assert await crud_rating_snapshot.get_scores(session, day, versions) is None
+
+    await crud_rating_snapshot.store(session, day, versions, None, [])
+
+    assert await crud_rating_snapshot.get_scores(session, day, versions) == []
+
+
+async def test_invalidation_is_part_of_write_transaction(session: AsyncSession):
+    day = date.today()
+    versions = await data_versions.versions(session, RATING_TABLES)
+    await crud_rating_snapshot.store(session, day, versions, None, [])
+
+    await crud_rating_snapshot.invalidate(session)
+    await session.rollback()
+    assert await crud_rating_snapshot.get_scores(session, day, versions) == []
+
+    await crud_rating_snapshot.invalidate(session)
+    await session.commit()
+    assert await crud_rating_snapshot.get_scores(session, day, versions) is None
+
+
+async def test_rating_changed_during_calculation_isnt_stored(
+    session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    [user] = await populate(session, 1)
+    store = crud_rating_snapshot.store
+
+    async def store_after_change(*args: Any) -> None:
+        await rename_user(user.id)
+        await store(*args)
+
+    monkeypatch.setattr(crud_rating_snapshot, "store", store_after_change)
+    async with async_session_maker() as write_session:
+        await prepare_rating(session, write_session)
+
+    await session.rollback()
+    assert await snapshot_rows(session) == 0
+    assert await snapshot_rows(session, RatingSnapshotHeader) == 0
+
+
+async def test_snapshot_of_previous_versions_isnt_used(session: AsyncSession):
+    [user] = await populate(session, 1)
+    day = date.today()
+    versions = await data_versions.versions(session, RATING_TABLES)
+    await crud_rating_snapshot.store(session, day, versions, None, [])
+
+    # Change is committed after snapshot without removing it
+    async with async_session_maker() as other_session:
+        other_user = await other_session.get(User, user.id)
+        assert other_user is not None
+        other_user.first_name = "Другое имя"
+        await other_session.commit()
+
+    versions = await data_versions.versions(session, RATING_TABLES)
+    assert await crud_rating_snapshot.get_scores(session, day, versions) is None
@@ -0,0 +1,109 @@
+"""Route images are stored together with their resized variants. Images
+uploaded by failed request are removed by garbage collection"""
+
+from datetime import date, timedelta
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO
+
+import pytest
+
+from fastapi import UploadFile
+from PIL import Image
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import Headers
+
+from climbing.core.config import settings
+from climbing.core.images import IMAGE_VARIANTS, variant_name
+from climbing.core.storage import get_storage_backend
+from climbing.crud.crud_route import route as crud_route
+from climbing.db.models import Category, RouteCreate, StorageObject
+from climbing.util.storage_gc import collect_garbage
+from tests.factories import populate
+
+
+def make_image(width: int, height: int) -> UploadFile:
+    data = BytesIO()
+    Image.new("RGB", (width, height), "red").save(data, format="PNG")
+    return UploadFile(
+        BytesIO(data.getvalue()),
+        size=len(data.getvalue()),
+        filename="route.png",
+        headers=Headers({"content-type": "image/png"}),
+    )
+
+
+async def test_route_image_variants_are_stored(session: AsyncSession):
+    [user] = await populate(session, 1)
+
+    route = await crud_route.create(
+        session,
+        RouteCreate(
+            name="Трасса с фото",
+            category=Category.values()[0],
+            mark_color="Синий",
+            description="Описание",
+            creation_date=date.today(),
+            author_id=user.id,
+            images=[make_image(2000, 1000)],
+        ),
+    )
+
+    [image] = route.images
+    assert image.has_variants
+    stored = await session.get(StorageObject, image.url)
+    assert stored is not None
+    assert stored.ref_count == 1
+    assert stored.has_variants
+    media_root = Path(settings.MEDIA_ROOT)
+    assert (media_root / image.url).is_file()
+    for variant, max_width in IMAGE_VARIANTS.items():
+        with Image.open(media_root / variant_name(image.url, variant)) as resized:
+            assert resized.format == "WEBP"
+            assert resized.size == (max_width, max_width // 2)
+
+
+async def test_failed_upload_is_collected(
+    session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+):
+    [user] = await populate(session, 1)
+    backend = get_storage_backend()
+    put = backend.put
+    uploaded: list[str] = []
+
+    def fail_second_image(
+        name: str, data: BinaryIO, length: int, content_type: str
+    ) -> None:
+        # Variants are put after original image, so only the first image is
+        # stored with its variants
+        if content_type == "image/png":
+            if len(uploaded) > 0:
+                raise OSError("Storage is unavailable")
+            uploaded.append(name)
+        put(name, data, length, content_type)
+
+    monkeypatch.setattr(backend, "put", fail_second_image)
+    with pytest.raises(OSError):
+        await crud_route.create(
+            session,
+            RouteCreate(
+                name="Трасса с фото",
+                category=Category.values()[0],
+                mark_color="Синий",
+                description="Описание",
+                creation_date=date.today(),
+                author_id=user.id,
+                images=[make_image(2000, 1000), make_image(1000, 500)],
+            ),
+        )
+    await session.rollback()
+
+    [name] = uploaded
+    assert await session.get(StorageObject, name) is None
+    assert backend.exists(name)
+    # Left objects are removed by periodic garbage collection by default
+    assert settings.STORAGE_GC_INTERVAL is not None
+    await collect_garbage(session, backend, min_age=timedelta(0))
+    assert not backend.exists(name)
+    for variant in IMAGE_VARIANTS:
+        assert not backend.exists(variant_name(name, variant))
@@ -0,0 +1,96 @@
+from datetime import timedelta
+from io import BytesIO
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from climbing.api.deps import StoredFile
+from climbing.core.storage import StorageBackend, get_storage_backend
+from climbing.crud.crud_storage_object import storage_object as crud_storage_object
+from climbing.db.models import StorageObject
+from climbing.db.session import async_session_maker
+from climbing.util.storage_gc import collect_garbage, remove_objects
+
+
+@pytest.fixture
+def backend() -> StorageBackend:
+    storage_backend = get_storage_backend()
+    storage_backend.prepare()
+    return storage_backend
+
+
+def put(backend: StorageBackend, name: str) -> None:
+    backend.put(name, BytesIO(b"image"), 5, "image/jpeg")
+
+
+async def test_removal_job_keeps_objects_referenced_again(
+    session: AsyncSession, backend: StorageBackend
+):
+    put(backend, "routes_images/reuploaded.jpg")
+    put(backend, "routes_images/orphan.jpg")
+    # Same content was uploaded again after removal had been scheduled
+    session.add(StorageObject(name="routes_images/reuploaded.jpg", ref_count=1))
+    await session.commit()
+
+    await remove_objects(
+        {
+            "images": [
+                ["routes_images/reuploaded.jpg", False],
+                ["routes_images/orphan.jpg", False],
+            ]
+        }
+    )
+
+    assert backend.exists("routes_images/reuploaded.jpg")
+    assert not backend.exists("routes_images/orphan.jpg")
+
+
+async def test_removal_job_can_be_retried(
+    session: AsyncSession, backend: StorageBackend
+):
+    put(backend, "routes_images/removed.jpg")
+    payload = {"images": [["routes_images/removed.jpg", False]]}
+
+    await remove_objects(payload)
+    await remove_objects(payload)
+
+    assert not backend.exists("routes_images/removed.jpg")
+
+
+async def test_concurrent_first_uploads_share_counter(session: AsyncSession):
+    name = "routes_images/new.jpg"
+    async with async_session_maker() as first, async_session_maker() as second:
+        # Both requests see that the object isn't stored yet and upload it
+        assert await crud_storage_object.get_existing(first, [name]) == {}
+        assert await crud_storage_object.get_existing(second, [name]) == {}
+        await crud_storage_object.acquire(first, [StoredFile(name, True)])
+        await first.commit()
+        await crud_storage_object.acquire(
+            second, [StoredFile(name, True), StoredFile(name, True)]
+        )
+        await second.commit()
+
+    stored = await session.get(StorageObject, name)
+    assert stored is not None
+    assert stored.ref_count == 3
+    assert stored.has_variants
+
+
+@pytest.mark.parametrize("dry_run", [True, False])
+async def test_garbage_collection_report(
+    session: AsyncSession, backend: StorageBackend, dry_run: bool
+):
+    prefix = f"gc_{dry_run}/"
+    put(backend, f"{prefix}orphan.jpg")
+
+    report = await collect_garbage(
+        session, backend, prefix=prefix, min_age=timedelta(0), dry_run=dry_run
+    )
+
+    assert (report.orphaned, report.orphaned_bytes) == (1, 5)
+    if dry_run:
+        assert (report.removed, report.bytes_reclaimed) == (0, 0)
+        assert backend.exists(f"{prefix}orphan.jpg")
+    else:
+        assert (report.removed, report.bytes_reclaimed) == (1, 5)
+        assert not backend.exists(f"{prefix}orphan.jpg")
@@ -0,0 +1,45 @@
+"""Changes of users made through user manager invalidate rating"""
+
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col
+
+from climbing.core.job_queue import REFRESH_RATING_JOB
+from climbing.core.user_manager import UserManager
+from climbing.db.models import Job, User, UserUpdate
+from climbing.db.models.user import OAuthAccount
+from climbing.db.user_database import UserDatabase
+from climbing.util.rating_cache import rating_cache
+from tests.factories import make_user, populate
+
+CACHE_KEY = rating_cache.make_key(datetime.min, datetime.max, "", "")
+
+
+async def assert_rating_invalidated(session: AsyncSession) -> None:
+    assert rating_cache.get(CACHE_KEY) is None
+    assert (
+        await session.scalars(
+            select(col(Job.kind)).where(col(Job.kind) == REFRESH_RATING_JOB)
+        )
+    ).all() == [REFRESH_RATING_JOB]
+
+
+async def test_update_and_delete_invalidate_rating(session: AsyncSession):
+    [user] = await populate(session, 1)
+    # User without routes and ascents, which are deleted by endpoints first
+    user_without_content = make_user(1)
+    session.add(user_without_content)
+    await session.commit()
+    user_manager = UserManager(UserDatabase(session, User, OAuthAccount))
+
+    rating_cache.put(CACHE_KEY, [])
+    await user_manager.update(
+        UserUpdate(first_name="Другое имя", last_name=user.last_name), user
+    )
+    await assert_rating_invalidated(session)
+
+    rating_cache.put(CACHE_KEY, [])
+    await user_manager.delete(user_without_content)
+    await assert_rating_invalidated(session)
@@ -0,0 +1,100 @@
+"""Merged user's data is moved to replacement, and latest ascents of
+replacement are rebuilt from ascents of both users"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col
+
+from climbing.core.user_manager import UserManager
+from climbing.crud.crud_ascent import ascent as crud_ascent
+from climbing.crud.crud_user import user as crud_user
+from climbing.db.models import (
+    Ascent,
+    AscentCreate,
+    Competition,
+    CompetitionParticipant,
+    LatestAscent,
+    Route,
+    User,
+)
+from climbing.db.models.user import OAuthAccount
+from climbing.db.user_database import UserDatabase
+from tests.factories import populate
+
+
+async def test_merge_moves_data_and_removes_user(session: AsyncSession):
+    # Both users take part in every competition and climbed every route
+    [user, replacement] = await populate(session, 2)
+    user_id, replacement_id = user.id, replacement.id
+    route_ids = (
+        await session.scalars(select(col(Route.id)).order_by(col(Route.name)))
+    ).all()
+    now = datetime.now(timezone.utc)
+    newest_ascents = {}
+    for route_id, climber_id in zip(route_ids, [user_id, replacement_id]):
+        ascent = await crud_ascent.create(
+            session,
+            AscentCreate(
+                is_flash=False,
+                date=now + timedelta(hours=1),
+                user_id=climber_id,
+                route_id=route_id,
+            ),
+        )
+        newest_ascents[route_id] = ascent.id
+    ascents_count = await session.scalar(select(func.count(col(Ascent.id))))
+    replacement_places = dict(
+        (
+            await session.execute(
+                select(
+                    col(CompetitionParticipant.competition_id),
+                    col(CompetitionParticipant.place),
+                ).where(col(CompetitionParticipant.user_id) == replacement_id)
+            )
+        ).all()
+    )
+    user_manager = UserManager(UserDatabase(session, User, OAuthAccount))
+
+    await crud_user.merge(session, user, replacement)
+    await user_manager.delete(user)
+
+    assert await session.get(User, user_id) is None
+    assert (await session.scalars(select(col(Ascent.user_id)).distinct())).all() == [
+        replacement_id
+    ]
+    assert await session.scalar(select(func.count(col(Ascent.id)))) == ascents_count
+    assert (await session.scalars(select(col(Route.author_id)).distinct())).all() == [
+        replacement_id
+    ]
+    assert (
+        await session.scalars(select(col(Competition.organizer_id)).distinct())
+    ).all() == [replacement_id]
+    # Participation of replacement is kept in shared competitions
+    participations = (
+        await session.execute(
+            select(
+                col(CompetitionParticipant.user_id),
+                col(CompetitionParticipant.competition_id),
+                col(CompetitionParticipant.place),
+            )
+        )
+    ).all()
+    assert sorted(participations) == sorted(
+        (replacement_id, competition_id, place)
+        for competition_id, place in replacement_places.items()
+    )
+    latest_ascents = (
+        await session.execute(
+            select(
+                col(LatestAscent.user_id),
+                col(LatestAscent.route_id),
+                col(LatestAscent.ascent_id),
+            )
+        )
+    ).all()
+    assert sorted(latest_ascents) == sorted(
+        (replacement_id, route_id, ascent_id)
+        for route_id, ascent_id in newest_ascents.items()
+    )
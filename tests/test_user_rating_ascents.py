@@ -0,0 +1,66 @@
+"""User's rating ascents contain the latest ascent of each route whether they
+are taken from cached rating or queried"""
+
+from datetime import datetime, timedelta, timezone
+from typing import AsyncGenerator
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col
+
+from climbing.api.api_v1.endpoints.rating import prepare_rating
+from climbing.crud.crud_ascent import ascent as crud_ascent
+from climbing.db.models import AscentCreate, Route
+from climbing.db.session import async_session_maker
+from climbing.util.rating_cache import rating_cache
+from tests.factories import populate
+
+
+@pytest.fixture(autouse=True)
+async def empty_cache() -> AsyncGenerator[None, None]:
+    rating_cache.invalidate()
+    yield
+    rating_cache.invalidate()
+
+
+async def test_repeated_ascents_are_shown_once(
+    client: AsyncClient, session: AsyncSession
+):
+    [user, _] = await populate(session, 2)
+    route_ids = (
+        await session.scalars(select(col(Route.id)).order_by(col(Route.name)))
+    ).all()
+    now = datetime.now(timezone.utc)
+    # Earlier repeat of route, which is climbed again today
+    await crud_ascent.create(
+        session,
+        AscentCreate(
+            is_flash=True,
+            date=now - timedelta(days=3),
+            user_id=user.id,
+            route_id=route_ids[0],
+        ),
+    )
+    url = f"/api/v2/rating/user/{user.id}/ascents"
+
+    queried = (await client.get(url)).json()
+    assert rating_cache.stats.size == 0
+    async with async_session_maker() as rating_session:
+        await prepare_rating(rating_session, None)
+    cached = (await client.get(url)).json()
+    assert rating_cache.stats.hits == 1
+    past_start = (now - timedelta(days=10)).replace(tzinfo=None).isoformat()
+    past_window = (await client.get(url, params={"start_date": past_start})).json()
+
+    assert cached == queried
+    for ascents in (queried, past_window):
+        assert sorted(ascent["route"]["id"] for ascent in ascents) == sorted(
+            str(route_id) for route_id in route_ids
+        )
+        assert all(ascent["taken_in_account"] for ascent in ascents)
+    [repeated] = [
+        ascent for ascent in queried if ascent["route"]["id"] == str(route_ids[0])
+    ]
+    assert not repeated["is_flash"]